@@ -1,7 +1,27 @@
-from .base import BaseAnalyzer
-from .static_analyzer import StaticAnalyzer
+"""Analyzers that update the interaction state from each user message."""
+from typing import TYPE_CHECKING
+from ..utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .base import BaseAnalyzer
+    from .pipeline import AnalyzerPipeline
+    from .batched import BatchedAnalyzer, MessageBatcher, SklearnMessageAnalyzer
+    from .static_analyzer import StaticAnalyzer
 
 __all__ = [
-    'BaseAnalyzer', 
+    'BaseAnalyzer',
+    'AnalyzerPipeline',
+    'BatchedAnalyzer',
+    'MessageBatcher',
+    'SklearnMessageAnalyzer',
     'StaticAnalyzer',
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BaseAnalyzer': '.base',
+    'AnalyzerPipeline': '.pipeline',
+    'BatchedAnalyzer': '.batched',
+    'MessageBatcher': '.batched',
+    'SklearnMessageAnalyzer': '.batched',
+    'StaticAnalyzer': '.static_analyzer',
+})
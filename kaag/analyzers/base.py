@@ -1,11 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 
 class BaseAnalyzer(ABC):
+    # State keys the analyzer reads and writes, used by AnalyzerPipeline to run
+    # independent analyzers concurrently. Analyzers that leave these as None run
+    # alone, in config order.
+    reads: Optional[Tuple[str, ...]] = None
+    writes: Optional[Tuple[str, ...]] = None
+    # Seconds per turn before the pipeline gives up and keeps the previous values.
+    timeout: Optional[float] = None
+
     @abstractmethod
     def analyze(self, current_state: Dict[str, Any]) -> Dict[str, Any]:
         pass
 
+    async def aanalyze(self, current_state: Dict[str, Any]) -> Dict[str, Any]:
+        # Analyzers doing I/O or heavy inference should override this with a non-blocking version.
+        return self.analyze(current_state)
+
     @abstractmethod
     def update_properties(self, properties: Any) -> Dict[str, Any]:
         pass
\ No newline at end of file
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import threading
+from abc import abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..utils.batching import MicroBatchQueue
+from .base import BaseAnalyzer
+
+Scores = Dict[str, float]
+
+class MessageBatcher:
+    """Scores messages from many threads in batched ``predict`` calls, with an LRU result cache.
+
+    Messages are queued until ``max_batch_size`` are waiting or the oldest has
+    waited ``max_wait`` seconds. Cached messages are answered immediately and
+    identical messages already queued share one slot in the batch. Every call
+    gets its own future, so cancelling one caller's wait does not affect others.
+    """
+
+    def __init__(self, predict: Callable[[List[str]], Sequence[Scores]], max_batch_size: int = 64,
+                 max_wait: float = 0.005, cache_size: int = 4096):
+        self.predict = predict
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, Scores]' = OrderedDict()
+        # Futures of every caller waiting on a queued message.
+        self._waiters: Dict[str, List[Future]] = {}
+        self._lock = threading.Lock()
+        self._queue: MicroBatchQueue[str] = MicroBatchQueue(self._score_batch, max_batch_size, max_wait, 'MessageBatcher')
+
+        self._requests = 0
+        self._cache_hits = 0
+
+    def score(self, message: str) -> Scores:
+        return self.submit(message).result()
+
+    def submit(self, message: str) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._requests += 1
+            scores = self._cache.get(message)
+            if scores is not None:
+                self._cache.move_to_end(message)
+                self._cache_hits += 1
+                future.set_result(scores)
+                return future
+            waiters = self._waiters.get(message)
+            if waiters is not None:
+                waiters.append(future)
+                return future
+            self._queue.put(message)
+            self._waiters[message] = [future]
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        queue_stats = self._queue.stats()
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'cache_hits': self._cache_hits,
+                'cache_hit_rate': self._cache_hits / self._requests if self._requests else 0.0,
+                'batches': queue_stats['batches'],
+                'mean_batch_size': queue_stats['mean_batch_size'],
+                'queue_depth': queue_stats['queue_depth'],
+            }
+
+    def close(self):
+        self._queue.close()
+
+    def _score_batch(self, messages: List[str]):
+        try:
+            results = list(self.predict(messages))
+            if len(results) != len(messages):
+                raise RuntimeError(f"Model returned {len(results)} results for {len(messages)} messages")
+        except BaseException as e:
+            with self._lock:
+                waiters = [self._waiters.pop(message) for message in messages]
+            for futures in waiters:
+                _deliver(futures, exception=e)
+            return
+
+        with self._lock:
+            waiters = [self._waiters.pop(message) for message in messages]
+            for message, scores in zip(messages, results):
+                self._cache[message] = scores
+                self._cache.move_to_end(message)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        for futures, scores in zip(waiters, results):
+            _deliver(futures, result=scores)
+
+
+def _deliver(futures: List[Future], result: Any = None, exception: Optional[BaseException] = None):
+    for future in futures:
+        # Callers that gave up (e.g. an analyzer timeout) have cancelled their future.
+        if not future.set_running_or_notify_cancel():
+            continue
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+class BatchedAnalyzer(BaseAnalyzer):
+    """Base for analyzers that infer metrics from ``last_message`` with a batch model.
+
+    Subclasses implement :meth:`load_model` and :meth:`predict_batch`. KAAG
+    creates one analyzer per session, but every instance of a class with the
+    same ``params`` shares one loaded model and one :class:`MessageBatcher`,
+    so messages from concurrent sessions are scored together.
+    """
+
+    reads = ('last_message',)
+    max_batch_size = 64
+    max_wait = 0.005
+    cache_size = 4096
+
+    _shared: Dict[Tuple[type, str], MessageBatcher] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, **params):
+        self.params = params
+        self.batcher = self._shared_batcher(params)
+
+    @classmethod
+    def _shared_batcher(cls, params: Dict[str, Any]) -> MessageBatcher:
+        key = (cls, json.dumps(params, sort_keys=True, default=repr))
+        with cls._shared_lock:
+            batcher = BatchedAnalyzer._shared.get(key)
+            if batcher is None:
+                model = cls.load_model(**params)
+                batcher = MessageBatcher(
+                    lambda messages: cls.predict_batch(model, messages),
+                    cls.max_batch_size, cls.max_wait, cls.cache_size
+                )
+                BatchedAnalyzer._shared[key] = batcher
+            return batcher
+
+    @classmethod
+    def close_shared(cls):
+        # Mutate the registry in place: assigning cls._shared would shadow it on the subclass.
+        shared = BatchedAnalyzer._shared
+        with cls._shared_lock:
+            keys = [key for key in shared if issubclass(key[0], cls)]
+            batchers = [shared.pop(key) for key in keys]
+        for batcher in batchers:
+            batcher.close()
+
+    @classmethod
+    @abstractmethod
+    def load_model(cls, **params) -> Any:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def predict_batch(cls, model: Any, messages: List[str]) -> List[Scores]:
+        pass
+
+    def analyze(self, current_state: Dict[str, Any]) -> Dict[str, Any]:
+        message = current_state.get('last_message')
+        if not message:
+            return {}
+        return dict(self.batcher.score(message))
+
+    async def aanalyze(self, current_state: Dict[str, Any]) -> Dict[str, Any]:
+        message = current_state.get('last_message')
+        if not message:
+            return {}
+        return dict(await asyncio.wrap_future(self.batcher.submit(message)))
+
+    def update_properties(self, properties: Any) -> None:
+        # Metrics come from the model; there is nothing to set per turn.
+        pass
+
+
+class SklearnMessageAnalyzer(BatchedAnalyzer):
+    """Scores messages with a fitted scikit-learn text pipeline saved with joblib.
+
+    Params: ``model_path``; ``metrics``, one name per output column of
+    ``method`` (``predict``, ``predict_proba`` or ``decision_function``); and
+    optional ``scale`` and ``clip`` (``[min, max]``) applied to the outputs,
+    e.g. ``scale: 100`` to map probabilities onto 0-100 metrics.
+    """
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.writes = tuple(params['metrics'])
+
+    @classmethod
+    def load_model(cls, model_path: str, metrics: Sequence[str], method: str = 'predict',
+                   scale: float = 1.0, clip: Optional[Sequence[float]] = None) -> Any:
+        import joblib
+        model = joblib.load(model_path)
+        if not hasattr(model, method):
+            raise ValueError(f"Model in {model_path} has no {method}() method")
+        return model, list(metrics), method, scale, clip
+
+    @classmethod
+    def predict_batch(cls, model: Any, messages: List[str]) -> List[Scores]:
+        estimator, metrics, method, scale, clip = model
+        outputs = np.asarray(getattr(estimator, method)(messages), dtype=np.float64).reshape(len(messages), -1)
+        if outputs.shape[1] != len(metrics):
+            raise ValueError(f"Model produced {outputs.shape[1]} outputs for metrics {metrics}")
+        outputs = outputs * scale
+        if clip is not None:
+            outputs = np.clip(outputs, clip[0], clip[1])
+        return [dict(zip(metrics, row)) for row in outputs.tolist()]
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Dict, List, Optional, Sequence
+from .base import BaseAnalyzer
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _default_executor() -> ThreadPoolExecutor:
+    # One pool shared by every session's pipeline, created on first concurrent use.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='kaag-analyzer')
+        return _executor
+
+
+class AnalyzerPipeline:
+    """Runs a session's analyzers in dependency order, concurrently where possible.
+
+    Analyzers declare the state keys they ``reads`` and ``writes``. An analyzer
+    runs after every earlier analyzer (in config order) that writes a key it
+    reads or writes; analyzers without declarations run on their own, in
+    order, as before. Each level of independent analyzers sees the state as it
+    was before the level, and the results are merged in config order.
+
+    An analyzer that misses its ``timeouts`` deadline (seconds) is skipped for
+    the turn, so the keys it writes keep their previous values; its call is
+    not cancelled and finishes in the background. Exceptions propagate.
+    ``last_timings`` holds the seconds each analyzer took in the last run.
+    """
+
+    def __init__(self, analyzers: Sequence[BaseAnalyzer], names: Optional[Sequence[str]] = None,
+                 timeouts: Optional[Sequence[Optional[float]]] = None, executor: Optional[Executor] = None):
+        self.analyzers = list(analyzers)
+        self.names = list(names) if names is not None else [type(analyzer).__name__ for analyzer in self.analyzers]
+        self.timeouts = list(timeouts) if timeouts is not None else [getattr(a, 'timeout', None) for a in self.analyzers]
+        self.executor = executor
+        self.levels = self._build_levels()
+        self.last_timings: Dict[str, float] = {}
+        self.timeout_counts: Dict[str, int] = {name: 0 for name in self.names}
+        self.logger = logging.getLogger('KAAG')
+
+    def _build_levels(self) -> List[List[int]]:
+        levels: List[int] = []
+        for i, analyzer in enumerate(self.analyzers):
+            level = 0
+            for j in range(i):
+                if _depends(analyzer, self.analyzers[j]):
+                    level = max(level, levels[j] + 1)
+            levels.append(level)
+        return [[i for i, level in enumerate(levels) if level == n] for n in range(max(levels, default=-1) + 1)]
+
+    def _inline(self, level: List[int]) -> bool:
+        return len(level) == 1 and self.timeouts[level[0]] is None
+
+    def run(self, state: Dict[str, Any]):
+        self.last_timings = {}
+        for level in self.levels:
+            if self._inline(level):
+                i = level[0]
+                start = time.perf_counter()
+                result = self.analyzers[i].analyze(state)
+                self.last_timings[self.names[i]] = time.perf_counter() - start
+                state.update(result)
+                continue
+
+            executor = self.executor or _default_executor()
+            level_start = time.perf_counter()
+            futures = [executor.submit(self._timed, i, state, self.last_timings) for i in level]
+            results = []
+            for i, future in zip(level, futures):
+                timeout = self.timeouts[i]
+                remaining = None if timeout is None else max(timeout - (time.perf_counter() - level_start), 0.0)
+                try:
+                    results.append(future.result(timeout=remaining))
+                except FutureTimeoutError:
+                    self._timed_out(i, timeout)
+            for result in results:
+                state.update(result)
+
+    async def arun(self, state: Dict[str, Any]):
+        self.last_timings = {}
+        for level in self.levels:
+            if self._inline(level):
+                i = level[0]
+                start = time.perf_counter()
+                result = await self._acall(self.analyzers[i], state)
+                self.last_timings[self.names[i]] = time.perf_counter() - start
+                state.update(result)
+                continue
+
+            outcomes = await asyncio.gather(*(self._arun_one(i, state) for i in level))
+            for result in outcomes:
+                if result is not None:
+                    state.update(result)
+
+    def _timed(self, i: int, state: Dict[str, Any], timings: Dict[str, float]) -> Dict[str, Any]:
+        # timings is this run's dict, so a call finishing after its deadline cannot touch the next run's.
+        start = time.perf_counter()
+        result = self.analyzers[i].analyze(state)
+        timings.setdefault(self.names[i], time.perf_counter() - start)
+        return result
+
+    async def _arun_one(self, i: int, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._acall(self.analyzers[i], state), self.timeouts[i])
+        except asyncio.TimeoutError:
+            self._timed_out(i, self.timeouts[i])
+            return None
+        self.last_timings[self.names[i]] = time.perf_counter() - start
+        return result
+
+    def _acall(self, analyzer: BaseAnalyzer, state: Dict[str, Any]) -> Awaitable[Dict[str, Any]]:
+        if type(analyzer).aanalyze is BaseAnalyzer.aanalyze:
+            # A blocking analyze() would stall the loop and ignore the deadline, so run it in the pool.
+            loop = asyncio.get_running_loop()
+            return loop.run_in_executor(self.executor or _default_executor(), analyzer.analyze, state)
+        return analyzer.aanalyze(state)
+
+    def _timed_out(self, i: int, timeout: Optional[float]):
+        self.timeout_counts[self.names[i]] += 1
+        self.last_timings[self.names[i]] = timeout
+        self.logger.warning("Analyzer %s exceeded its %.3fs deadline; keeping previous values", self.names[i], timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'levels': [[self.names[i] for i in level] for level in self.levels],
+            'last_timings': dict(self.last_timings),
+            'timeouts': dict(self.timeout_counts),
+        }
+
+
+def _depends(later: BaseAnalyzer, earlier: BaseAnalyzer) -> bool:
+    if later.reads is None or later.writes is None or earlier.reads is None or earlier.writes is None:
+        return True
+    written = set(earlier.writes)
+    return bool(written & set(later.reads) or written & set(later.writes))
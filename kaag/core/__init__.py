@@ -1,5 +1,45 @@
-from .kaag import KAAG
-from .rag import RAG
-from .norag import NoRAG
+"""Conversation agents. ``from kaag.core import NoRAG`` does not load the graph, NumPy or networkx."""
+from typing import TYPE_CHECKING
+from ..utils.lazy import lazy_exports
 
-__all__ = ['KAAG', 'RAG', 'NoRAG']
\ No newline at end of file
+if TYPE_CHECKING:
+    from .budget import PromptBudget, PromptReport
+    from .graph import ConversationGraph, Stage
+    from .history import ConversationHistory, JsonlHistoryWriter
+    from .prompt import PromptCache
+    from .state import InteractionState, MetricSchema, StateBank
+    from .kaag import KAAG
+    from .rag import RAG
+    from .norag import NoRAG
+
+__all__ = [
+    'PromptBudget',
+    'PromptReport',
+    'ConversationGraph',
+    'Stage',
+    'ConversationHistory',
+    'JsonlHistoryWriter',
+    'PromptCache',
+    'InteractionState',
+    'MetricSchema',
+    'StateBank',
+    'KAAG',
+    'RAG',
+    'NoRAG',
+]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'PromptBudget': '.budget',
+    'PromptReport': '.budget',
+    'ConversationGraph': '.graph',
+    'Stage': '.graph',
+    'ConversationHistory': '.history',
+    'JsonlHistoryWriter': '.history',
+    'PromptCache': '.prompt',
+    'InteractionState': '.state',
+    'MetricSchema': '.state',
+    'StateBank': '.state',
+    'KAAG': '.kaag',
+    'RAG': '.rag',
+    'NoRAG': '.norag',
+})
@@ -0,0 +1,94 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from ..utils.tokens import TokenCounter, estimate_tokens
+from .history import ConversationHistory, Turn
+
+Sections = Dict[str, List[str]]
+
+class PromptReport(NamedTuple):
+    total: int
+    # Tokens of the kept items per trimmable section; the rest of ``total`` is fixed text.
+    sections: Dict[str, int]
+    # Items dropped per section to fit the budget.
+    dropped: Dict[str, int]
+
+    @property
+    def fixed(self) -> int:
+        return self.total - sum(self.sections.values())
+
+
+class PromptBudget:
+    """Fits a prompt into ``max_tokens`` by dropping items of its trimmable sections.
+
+    Sections are lists of items ordered most important first (e.g. the newest
+    history turn, the best retrieved passage); the least important items of the
+    sections named first in ``trim_order`` are dropped first. Token counts come
+    from ``token_counter`` (a ``len / 4`` estimate unless a real tokenizer is
+    plugged in). The prompt is rendered once, and once more only if it had to be
+    trimmed. Text outside the sections is never trimmed, so a prompt whose fixed
+    part alone exceeds the budget is returned over budget. With
+    ``max_tokens=None`` the prompt is rendered as is, nothing is counted and no
+    report is produced.
+    """
+
+    DEFAULT_TRIM_ORDER = ('examples', 'conversation_history', 'retrieved_information')
+
+    def __init__(self, max_tokens: Optional[int] = None, token_counter: TokenCounter = estimate_tokens,
+                 trim_order: Sequence[str] = DEFAULT_TRIM_ORDER):
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.trim_order = tuple(trim_order)
+        self._cost_cache: Dict[Tuple[str, ...], List[int]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'PromptBudget':
+        """Budget from the ``llm.max_prompt_tokens`` setting, if any."""
+        return cls(max_tokens=config.get('llm', {}).get('max_prompt_tokens'))
+
+    def item_costs(self, items: Tuple[str, ...]) -> List[int]:
+        """Token counts of ``items``, cached for sections that repeat every turn such as a stage's examples."""
+        costs = self._cost_cache.get(items)
+        if costs is None:
+            costs = self._cost_cache[items] = [self.token_counter(item) for item in items]
+        return costs
+
+    def assemble(self, render: Callable[[Sections], str], sections: Sections,
+                 costs: Optional[Dict[str, List[int]]] = None) -> Tuple[str, Optional[PromptReport]]:
+        """Render ``sections`` within the budget; ``costs`` may supply known per-item token counts."""
+        if self.max_tokens is None:
+            return render(sections), None
+
+        known = costs or {}
+        costs = {
+            name: known[name] if name in known else [self.token_counter(item) for item in items]
+            for name, items in sections.items()
+        }
+        kept = {name: len(items) for name, items in sections.items()}
+
+        prompt = render(sections)
+        total = self.token_counter(prompt)
+        if total > self.max_tokens:
+            excess = total - self.max_tokens
+            for name in self.trim_order + tuple(name for name in sections if name not in self.trim_order):
+                while excess > 0 and kept.get(name, 0) > 0:
+                    kept[name] -= 1
+                    excess -= costs[name][kept[name]]
+            prompt = render({name: items[:kept[name]] for name, items in sections.items()})
+            total = self.token_counter(prompt)
+
+        return prompt, PromptReport(
+            total=total,
+            sections={name: sum(costs[name][:kept[name]]) for name in sections},
+            dropped={name: len(items) - kept[name] for name, items in sections.items()}
+        )
+
+
+def history_items(conversation_history: Union[str, Sequence[Turn]]) -> List[str]:
+    """Split a history into budget items, newest turn first.
+
+    A pre-formatted string cannot be split reliably and is kept or dropped whole.
+    """
+    if isinstance(conversation_history, str):
+        return [conversation_history] if conversation_history else []
+    if isinstance(conversation_history, ConversationHistory):
+        return conversation_history.formatted_turns()[::-1]
+    return [ConversationHistory.format_turn(turn) for turn in reversed(conversation_history)]
@@ -0,0 +1,164 @@
+from functools import lru_cache
+import hashlib
+import json
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, NamedTuple, Tuple, Type
+from ..analyzers.base import BaseAnalyzer
+from ..dbn.dbn import DynamicBayesianNetwork
+from ..gim.gim import GamifiedInteractionModel
+from ..gim.policies import create_policy
+from ..utils.expression import compile_expression
+from .state import InteractionState, MetricSchema
+import importlib
+
+if TYPE_CHECKING:
+    from ..dbn.analysis import FlowAnalysis
+
+class Stage(NamedTuple):
+    id: str
+    instructions: str
+    examples: Tuple[Mapping[str, str], ...]
+    is_leaf: bool
+    # Examples in the {"user", "assistant"} shape the prompt templates render.
+    formatted_examples: Tuple[Dict[str, str], ...] = ()
+    # The same examples as prompt budget items.
+    example_texts: Tuple[str, ...] = ()
+
+
+class ConversationGraph:
+    """Compiled, read-only form of a KAAG config.
+
+    Everything here is derived from the config once and shared by reference
+    between sessions; per-session state (current node, metrics, history) lives
+    on the ``KAAG`` instance.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.persona = config['persona']
+        self.initial_node: str = config.get('initial_node', 'initial_contact')
+        self.initial_metrics: Mapping[str, Any] = MappingProxyType({
+            metric: details['initial']
+            for metric, details in config['metrics'].items()
+        })
+        # Optional per-metric range, used to check that transition bounds can be met.
+        self.metric_domains: Mapping[str, Tuple[float, float]] = MappingProxyType({
+            metric: (float(details.get('min', float('-inf'))), float(details.get('max', float('inf'))))
+            for metric, details in config['metrics'].items()
+        })
+        self.stages: Tuple[Stage, ...] = tuple(_create_stage(stage) for stage in config['stages'])
+        self.stage_index: Mapping[str, Stage] = MappingProxyType({stage.id: stage for stage in self.stages})
+        self.analyzer_configs: Tuple[Mapping[str, Any], ...] = tuple(
+            MappingProxyType(dict(analyzer_config)) for analyzer_config in config.get('analyzers', [])
+        )
+        self.analyzer_classes: Tuple[Type[BaseAnalyzer], ...] = tuple(
+            _import_class(analyzer_config['class'])
+            for analyzer_config in self.analyzer_configs
+        )
+        self.analyzer_names: Tuple[str, ...] = tuple(
+            analyzer_config.get('name', analyzer_config['class'].rsplit('.', 1)[-1])
+            for analyzer_config in self.analyzer_configs
+        )
+
+        self.dbn = DynamicBayesianNetwork()
+        for stage in self.stages:
+            self.dbn.add_node(stage.id, is_leaf=stage.is_leaf)
+
+        for stage in config['stages']:
+            for transition in stage.get('transitions', []):
+                self.dbn.add_edge(
+                    stage['id'],
+                    transition['to'],
+                    condition=_create_condition_function(transition.get('conditions', {})),
+                    utility=_create_utility_function(transition.get('utility')),
+                    bounds=transition.get('conditions', {})
+                )
+
+        compiled = self.dbn.compile(list(self.initial_metrics))
+        self.metric_schema = MetricSchema(compiled.metrics, self.initial_metrics)
+        # Identifies the metric vector layout and stage ids that session snapshots depend on.
+        self.fingerprint: str = hashlib.sha256(
+            json.dumps([compiled.metrics, [stage.id for stage in self.stages]]).encode('utf-8')
+        ).hexdigest()[:16]
+        self.config_fingerprint: str = config_fingerprint(config)
+        self.gim = GamifiedInteractionModel(self.dbn, create_policy(config.get('policy')))
+
+    def get_stage(self, node: str) -> Stage:
+        stage = self.stage_index.get(node)
+        if stage is None:
+            return Stage(id=node, instructions='', examples=(), is_leaf=False)
+        return stage
+
+    def analyze(self) -> 'FlowAnalysis':
+        return self.dbn.analyze(self.initial_node, self.metric_domains)
+
+    def new_state(self) -> InteractionState:
+        return self.metric_schema.new_state()
+
+    def create_analyzers(self) -> List[BaseAnalyzer]:
+        analyzers = []
+        for analyzer_class, analyzer_config in zip(self.analyzer_classes, self.analyzer_configs):
+            analyzer = analyzer_class(**analyzer_config.get('params', {}))
+            # The config may declare or override what the pipeline needs to schedule the analyzer.
+            for key in ('reads', 'writes'):
+                if key in analyzer_config:
+                    setattr(analyzer, key, tuple(analyzer_config[key]))
+            if 'timeout' in analyzer_config:
+                analyzer.timeout = analyzer_config['timeout']
+            analyzers.append(analyzer)
+        return analyzers
+
+
+def config_fingerprint(config: Dict[str, Any]) -> str:
+    """Hash of the config parts a session depends on: metric and stage ids plus history and LLM settings.
+
+    Cheap enough to check that a config handed to ``KAAG`` matches its graph's.
+    """
+    return hashlib.sha256(json.dumps([
+        list(config['metrics']),
+        [stage['id'] for stage in config['stages']],
+        config.get('history'),
+        config.get('llm'),
+    ], sort_keys=True, default=repr).encode('utf-8')).hexdigest()[:16]
+
+
+def _create_stage(stage: Dict[str, Any]) -> Stage:
+    formatted_examples = tuple(
+        {"user": example['user'], "assistant": example['AI']}
+        for example in stage.get('examples', [])
+    )
+    return Stage(
+        id=stage['id'],
+        instructions=stage.get('instructions', ''),
+        examples=tuple(MappingProxyType(dict(example)) for example in stage.get('examples', [])),
+        is_leaf=stage.get('is_leaf', False),
+        formatted_examples=formatted_examples,
+        example_texts=tuple(str(example) for example in formatted_examples)
+    )
+
+
+@lru_cache(maxsize=None)
+def _import_class(path: str) -> type:
+    module_name, class_name = path.rsplit('.', 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def _create_condition_function(conditions: Dict[str, Any]):
+    def condition_function(interaction_state: Dict[str, Any]) -> bool:
+        return all(
+            interaction_state.get(metric, 0) >= min_value and interaction_state.get(metric, 0) <= max_value
+            for metric, (min_value, max_value) in conditions.items()
+        )
+    return condition_function
+
+
+def _create_utility_function(utility_config):
+    if callable(utility_config):
+        return utility_config
+    elif isinstance(utility_config, dict) and 'function' in utility_config:
+        return compile_expression(utility_config['function'])
+    elif isinstance(utility_config, (int, float)):
+        return compile_expression(repr(float(utility_config)))
+    else:
+        return compile_expression('0')
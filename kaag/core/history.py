@@ -0,0 +1,114 @@
+import json
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from ..utils.tokens import TokenCounter, estimate_tokens
+
+Turn = Dict[str, str]
+
+class ConversationHistory(Sequence[Turn]):
+    """Sliding window over the most recent ``{"user", "assistant"}`` turns.
+
+    The window holds at most ``max_turns`` turns and, if ``max_tokens`` is set,
+    only as many recent turns as fit in that many tokens of formatted text (the
+    newest turn is always kept). Turns that fall out of the window are passed to
+    ``on_evict``, e.g. a summarizer or a :class:`JsonlHistoryWriter`, and then
+    dropped, so memory stays bounded however long the session runs.
+
+    The formatted text of the window is maintained as turns come and go, so
+    :meth:`format` does not rebuild it. Indexing, slicing, iteration and
+    ``len`` behave like a list of the turns in the window.
+    """
+
+    def __init__(self, max_turns: Optional[int] = 5, max_tokens: Optional[int] = None,
+                 token_counter: TokenCounter = estimate_tokens,
+                 on_evict: Optional[Callable[[Turn], None]] = None):
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.on_evict = on_evict
+        # (turn, formatted text, token count) per turn in the window.
+        self._entries: Deque[Tuple[Turn, str, int]] = deque()
+        self._text = ''
+        self._tokens = 0
+        self.total_turns = 0
+
+    @staticmethod
+    def format_turn(turn: Turn) -> str:
+        return f"User: {turn['user']}\nAssistant: {turn['assistant']}\n"
+
+    def append(self, turn: Turn):
+        text = self.format_turn(turn)
+        tokens = self.token_counter(text) if self.max_tokens is not None else 0
+        self._entries.append((turn, text, tokens))
+        self._text += text
+        self._tokens += tokens
+        self.total_turns += 1
+        self._trim()
+
+    def extend(self, turns: Sequence[Turn]):
+        for turn in turns:
+            self.append(turn)
+
+    def clear(self):
+        self._entries.clear()
+        self._text = ''
+        self._tokens = 0
+
+    def format(self) -> str:
+        return self._text
+
+    def formatted_turns(self) -> List[str]:
+        """Formatted text of each turn in the window, oldest first."""
+        return [entry[1] for entry in self._entries]
+
+    @property
+    def tokens(self) -> int:
+        """Token count of the window (only tracked when ``max_tokens`` is set)."""
+        return self._tokens
+
+    def _trim(self):
+        evicted_chars = 0
+        while self._entries and self._over_limit():
+            if len(self._entries) == 1 and self.max_turns != 0:
+                break
+            turn, text, tokens = self._entries.popleft()
+            self._tokens -= tokens
+            evicted_chars += len(text)
+            if self.on_evict is not None:
+                self.on_evict(turn)
+        if evicted_chars:
+            self._text = self._text[evicted_chars:]
+
+    def _over_limit(self) -> bool:
+        return ((self.max_turns is not None and len(self._entries) > self.max_turns)
+                or (self.max_tokens is not None and self._tokens > self.max_tokens))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Turn, List[Turn]]:
+        if isinstance(index, slice):
+            return [entry[0] for entry in list(self._entries)[index]]
+        return self._entries[index][0]
+
+    def __iter__(self) -> Iterator[Turn]:
+        return (entry[0] for entry in self._entries)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ConversationHistory, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ConversationHistory({list(self)!r})"
+
+
+class JsonlHistoryWriter:
+    """``on_evict`` hook that appends evicted turns to a JSON Lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, turn: Turn):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(turn) + '\n')
@@ -1,152 +1,199 @@
-from typing import Dict, Any, List
-from ..llm.base import LLMInterface
-from ..gim.gim import GamifiedInteractionModel
-from ..dbn.dbn import DynamicBayesianNetwork
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple, Union
+from ..llm.base import AsyncLLMInterface, LLMInterface, generate_async, generate_stream_async
 from ..analyzers.base import BaseAnalyzer
+from ..analyzers.pipeline import AnalyzerPipeline
+from .budget import PromptBudget, PromptReport, Sections, history_items
+from .graph import ConversationGraph, config_fingerprint
+from .history import ConversationHistory, JsonlHistoryWriter
+from .state import InteractionState, StateBank
+from .prompt import PromptCache, default_prompt_cache
 from jinja2 import Template
-import importlib
 import logging
 
+SNAPSHOT_FORMAT = 1
+
 class KAAG:
-    def __init__(self, llm: LLMInterface, config: Dict[str, Any], template: Template):
+    def __init__(self, llm: Union[LLMInterface, AsyncLLMInterface], config: Dict[str, Any], template: Template, graph: Optional[ConversationGraph] = None,
+                 prompt_cache: Optional[PromptCache] = None, prompt_budget: Optional[PromptBudget] = None,
+                 state_bank: Optional[StateBank] = None):
+        # Sessions sharing a graph must share its config, since history and budget settings come from it too.
+        if graph is not None and graph.config is not config and config_fingerprint(config) != graph.config_fingerprint:
+            raise ValueError("config does not match the config the graph was built from")
         self.llm = llm
         self.config = config
         self.template = template
-        self.dbn = DynamicBayesianNetwork()
-        self.gim = GamifiedInteractionModel(self.dbn)
-        self.analyzers: List[BaseAnalyzer] = []
-        self.interaction_state: Dict[str, Any] = {}
-        self.current_node: str = self.config.get('initial_node', 'initial_contact')
-        self.conversation_history: List[Dict[str, str]] = []
+        self.graph = graph if graph is not None else ConversationGraph(config)
+        self.prompt_cache = prompt_cache if prompt_cache is not None else default_prompt_cache
+        self.prompt_budget = prompt_budget if prompt_budget is not None else PromptBudget.from_config(self.graph.config)
+        self.last_prompt_report: Optional[PromptReport] = None
+        self.dbn = self.graph.dbn
+        self.gim = self.graph.gim
+        self.analyzers: List[BaseAnalyzer] = self.graph.create_analyzers()
+        self.analyzer_pipeline = AnalyzerPipeline(self.analyzers, self.graph.analyzer_names)
+        # With a shared bank the metric vector lives in one row of its array.
+        self.interaction_state: InteractionState = state_bank.allocate() if state_bank is not None else self.graph.new_state()
+        self.current_node: str = self.graph.initial_node
+        history_config = self.graph.config.get('history', {})
+        self.conversation_history = ConversationHistory(
+            max_turns=history_config.get('max_turns', 5),
+            max_tokens=history_config.get('max_tokens'),
+            on_evict=JsonlHistoryWriter(history_config['spill_path']) if history_config.get('spill_path') else None
+        )
         self.logger = self._setup_logger()
 
-        self._initialize_from_config()
-
     def _setup_logger(self):
         logger = logging.getLogger('KAAG')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('kaag_log.txt')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        # Sessions share the logger, so only the first one attaches the file handler.
+        if not logger.handlers:
+            logger.setLevel(logging.INFO)
+            handler = logging.FileHandler('kaag_log.txt')
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
         return logger
 
-    def _initialize_from_config(self):
-        for stage in self.config['stages']:
-            self.dbn.add_node(stage['id'], is_leaf=stage.get('is_leaf', False))
-        
-        for stage in self.config['stages']:
-            for transition in stage.get('transitions', []):
-                self.dbn.add_edge(
-                    stage['id'],
-                    transition['to'],
-                    condition=self._create_condition_function(transition.get('conditions', {})),
-                    utility=self._create_utility_function(transition.get('utility', lambda x: 0))
-                )
-
-        self.interaction_state = {
-            metric: details['initial']
-            for metric, details in self.config['metrics'].items()
-        }
+    def get_analyzers(self):
+        return self.analyzers
 
-        self._load_analyzers()
+    def process_turn(self, user_input: str) -> str:
+        prompt, is_leaf = self._prepare_turn(user_input)
+        response = self.llm.generate(prompt)
+        self._complete_turn(user_input, response, is_leaf)
+        return response
 
-    def _create_condition_function(self, conditions: Dict[str, Any]):
-        def condition_function(interaction_state: Dict[str, Any]) -> bool:
-            return all(
-                interaction_state.get(metric, 0) >= min_value and interaction_state.get(metric, 0) <= max_value
-                for metric, (min_value, max_value) in conditions.items()
-            )
-        return condition_function
-
-    def _create_utility_function(self, utility_config):
-        if callable(utility_config):
-            return utility_config
-        elif isinstance(utility_config, dict) and 'function' in utility_config:
-            return eval(utility_config['function'])
-        elif isinstance(utility_config, (int, float)):
-            return lambda x: utility_config
-        else:
-            return lambda x: 0
+    def process_turn_stream(self, user_input: str) -> Iterator[str]:
+        prompt, is_leaf = self._prepare_turn(user_input)
+        chunks = []
+        for chunk in self.llm.generate_stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self._complete_turn(user_input, ''.join(chunks), is_leaf)
+
+    async def aprocess_turn(self, user_input: str) -> str:
+        await self._arun_analyzers(user_input)
+        prompt, is_leaf = self._advance(user_input)
+        response = await generate_async(self.llm, prompt)
+        self._complete_turn(user_input, response, is_leaf)
+        return response
 
-    def _load_analyzers(self):
-        for analyzer_config in self.config.get('analyzers', []):
-            module_name, class_name = analyzer_config['class'].rsplit('.', 1)
-            module = importlib.import_module(module_name)
-            analyzer_class = getattr(module, class_name)
-            self.analyzers.append(analyzer_class())
+    async def aprocess_turn_stream(self, user_input: str) -> AsyncIterator[str]:
+        await self._arun_analyzers(user_input)
+        prompt, is_leaf = self._advance(user_input)
+        chunks = []
+        async for chunk in generate_stream_async(self.llm, prompt):
+            chunks.append(chunk)
+            yield chunk
+        self._complete_turn(user_input, ''.join(chunks), is_leaf)
 
-    def get_analyzers(self):
-        return self.analyzers
+    def _prepare_turn(self, user_input: str) -> Tuple[str, bool]:
+        self.interaction_state['last_message'] = user_input
+        self.analyzer_pipeline.run(self.interaction_state)
+        return self._advance(user_input)
 
-    def process_turn(self, user_input: str) -> str:
+    async def _arun_analyzers(self, user_input: str):
         self.interaction_state['last_message'] = user_input
-        for analyzer in self.analyzers:
-            self.interaction_state.update(analyzer.analyze(self.interaction_state))
+        await self.analyzer_pipeline.arun(self.interaction_state)
 
-        self.logger.info(f"Current State: {self.get_current_state()}")
+    def _advance(self, user_input: str) -> Tuple[str, bool]:
+        # Building the state dict is not free, so skip it unless it will be logged.
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Current State: %s", self.get_current_state())
 
         if self.dbn.is_leaf_node(self.current_node):
-            return self._handle_leaf_node(user_input)
+            return self._render_prompt(user_input), True
 
         next_node = self.gim.select_next_node(self.current_node, self.interaction_state)
-        self.logger.info(f"Transition: {self.current_node} -> {next_node}")
+        self.logger.info("Transition: %s -> %s", self.current_node, next_node)
         self.current_node = next_node
 
-        stage_instructions = next((stage['instructions'] for stage in self.config['stages'] if stage['id'] == self.current_node), '')
-        stage_examples = next((stage['examples'] for stage in self.config['stages'] if stage['id'] == self.current_node), '')
-
-        formatted_examples = [
-            {"user": example['user'], "assistant": example['AI']}
-            for example in stage_examples
-        ]
-
-        prompt = self.template.render(
-            persona=self.config['persona'],
-            knowledge={'state': 'Current knowledge state'},
-            aptitude={
-                'interaction_state': self.interaction_state,
-                'stage_specific_instructions': stage_instructions
-            },
-            conversation_history=self._format_conversation_history(),
-            user_message=user_input,
-            examples=formatted_examples
-        )
-        response = self.llm.generate(prompt)
+        return self._render_prompt(user_input), False
 
-        self.conversation_history.append({"user": user_input, "assistant": response})
-        return response
+    def _complete_turn(self, user_input: str, response: str, is_leaf: bool):
+        if is_leaf:
+            self.logger.info("Reached leaf node: %s. Conversation ended.", self.current_node)
+        else:
+            self.conversation_history.append({"user": user_input, "assistant": response})
+
+    def _render_prompt(self, user_input: str) -> str:
+        stage = self.graph.get_stage(self.current_node)
+        history = self.conversation_history
+
+        def render_with(n_examples: int, conversation_history: str) -> str:
+            # The example count is part of the key so each trimmed variant keeps a stable prefix.
+            return self.prompt_cache.render(
+                self.template, self.graph, (stage.id, n_examples),
+                static_context={
+                    'persona': self.graph.persona,
+                    'knowledge': {'state': 'Current knowledge state'},
+                    'examples': stage.formatted_examples[:n_examples]
+                },
+                dynamic_context={
+                    'aptitude': {
+                        'interaction_state': self.interaction_state,
+                        'stage_specific_instructions': stage.instructions
+                    },
+                    'conversation_history': conversation_history,
+                    'user_message': user_input
+                }
+            )
 
-    def _handle_leaf_node(self, user_input) -> str:
-        leaf_instructions = next((stage['instructions'] for stage in self.config['stages'] if stage['id'] == self.current_node), '')
-        stage_examples = next((stage['examples'] for stage in self.config['stages'] if stage['id'] == self.current_node), '')
-        formatted_examples = [
-            {"user": example['user'], "assistant": example['AI']}
-            for example in stage_examples
-        ]
-        prompt = self.template.render(
-            persona=self.config['persona'],
-            knowledge={'state': 'Current knowledge state'},
-            aptitude={
-                'interaction_state': self.interaction_state,
-                'stage_specific_instructions': leaf_instructions
-            },
-            conversation_history=self._format_conversation_history(),
-            user_message=user_input,
-            examples=formatted_examples
+        budget = self.prompt_budget
+        if budget.max_tokens is None:
+            self.last_prompt_report = None
+            return render_with(len(stage.formatted_examples), history.format())
+
+        def render(kept: Sections) -> str:
+            if len(kept['conversation_history']) == len(history):
+                conversation_history = history.format()
+            else:
+                conversation_history = ''.join(reversed(kept['conversation_history']))
+            return render_with(len(kept['examples']), conversation_history)
+
+        prompt, report = budget.assemble(
+            render,
+            {'examples': list(stage.example_texts), 'conversation_history': history_items(history)},
+            costs={'examples': budget.item_costs(stage.example_texts)}
         )
-        response = self.llm.generate(prompt)
-        self.logger.info(f"Reached leaf node: {self.current_node}. Conversation ended.")
-        return response
+        self.last_prompt_report = report
+        self.logger.debug("Prompt tokens: %d %s, dropped %s", report.total, report.sections, report.dropped)
+        return prompt
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Session state as a JSON-serializable record, to be resumed with :meth:`restore`.
+
+        Holds the current node, the metric vector, the extra state fields and
+        the history window; the graph and analyzers are not included and come
+        from the config of the session that restores it. Extra fields set by
+        analyzers must be JSON-serializable.
+        """
+        return {
+            'format': SNAPSHOT_FORMAT,
+            'graph': self.graph.fingerprint,
+            'node': self.current_node,
+            'metrics': self.interaction_state.vector.tolist(),
+            'extras': dict(self.interaction_state.extras),
+            'history': list(self.conversation_history),
+            'total_turns': self.conversation_history.total_turns
+        }
 
-    def _format_conversation_history(self) -> str:
-        formatted_history = ""
-        for turn in self.conversation_history[-5:]:  # Only use the last 5 turns
-            formatted_history += f"User: {turn['user']}\nAssistant: {turn['assistant']}\n"
-        return formatted_history
+    def restore(self, snapshot: Dict[str, Any]):
+        """Replace this session's state with a :meth:`snapshot` taken on the same graph."""
+        if snapshot.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format: {snapshot.get('format')!r}")
+        if snapshot['graph'] != self.graph.fingerprint:
+            raise ValueError("Snapshot was taken with a different conversation graph "
+                             f"({snapshot['graph']} != {self.graph.fingerprint})")
+        # Assign in place so a state allocated from a StateBank keeps its row.
+        self.interaction_state.vector[:] = snapshot['metrics']
+        self.interaction_state.extras = dict(snapshot['extras'])
+        self.current_node = snapshot['node']
+        self.conversation_history.clear()
+        self.conversation_history.extend(snapshot['history'])
+        self.conversation_history.total_turns = snapshot['total_turns']
+        self.last_prompt_report = None
 
     def get_current_state(self) -> Dict[str, Any]:
         return {
             'current_node': self.current_node,
-            'interaction_state': self.interaction_state
+            'interaction_state': self.interaction_state.to_dict()
         }
\ No newline at end of file
@@ -1,20 +1,52 @@
-from typing import Dict, Any
-from ..llm.base import LLMInterface
+from typing import Dict, Any, AsyncIterator, Iterator, Optional, Sequence, Union
+from ..llm.base import AsyncLLMInterface, LLMInterface, generate_async, generate_stream_async
+from .budget import PromptBudget, PromptReport, Sections, history_items
+from .history import Turn
+from .prompt import PromptCache, default_prompt_cache
 from jinja2 import Template
 
 class NoRAG:
-    def __init__(self, llm: LLMInterface, config: Dict[str, Any], template: Template):
+    def __init__(self, llm: Union[LLMInterface, AsyncLLMInterface], config: Dict[str, Any], template: Template, prompt_cache: Optional[PromptCache] = None,
+                 prompt_budget: Optional[PromptBudget] = None):
         self.llm = llm
         self.config = config
         self.template = template
+        self.prompt_cache = prompt_cache if prompt_cache is not None else default_prompt_cache
+        self.prompt_budget = prompt_budget if prompt_budget is not None else PromptBudget.from_config(config)
+        self.last_prompt_report: Optional[PromptReport] = None
 
-    def process_turn(self, user_input: str, conversation_history: str = "") -> str:
-        # Generate response using LLM with the template
-        prompt = self.template.render(
-            persona=self.config['persona'],
-            conversation_history=conversation_history,
-            user_message=user_input
-        )
+    def process_turn(self, user_input: str, conversation_history: Union[str, Sequence[Turn]] = "") -> str:
+        prompt = self._render_prompt(user_input, conversation_history)
         response = self.llm.generate(prompt)
 
-        return response
\ No newline at end of file
+        return response
+
+    def process_turn_stream(self, user_input: str, conversation_history: Union[str, Sequence[Turn]] = "") -> Iterator[str]:
+        prompt = self._render_prompt(user_input, conversation_history)
+        yield from self.llm.generate_stream(prompt)
+
+    async def aprocess_turn(self, user_input: str, conversation_history: Union[str, Sequence[Turn]] = "") -> str:
+        prompt = self._render_prompt(user_input, conversation_history)
+        return await generate_async(self.llm, prompt)
+
+    async def aprocess_turn_stream(self, user_input: str, conversation_history: Union[str, Sequence[Turn]] = "") -> AsyncIterator[str]:
+        prompt = self._render_prompt(user_input, conversation_history)
+        async for chunk in generate_stream_async(self.llm, prompt):
+            yield chunk
+
+    def _render_prompt(self, user_input: str, conversation_history: Union[str, Sequence[Turn]]) -> str:
+        # Generate response using LLM with the template
+        def render(kept: Sections) -> str:
+            return self.prompt_cache.render(
+                self.template, self.config, None,
+                static_context={'persona': self.config['persona']},
+                dynamic_context={
+                    'conversation_history': ''.join(reversed(kept['conversation_history'])),
+                    'user_message': user_input
+                }
+            )
+
+        prompt, self.last_prompt_report = self.prompt_budget.assemble(
+            render, {'conversation_history': history_items(conversation_history)}
+        )
+        return prompt
\ No newline at end of file
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+from jinja2 import Template
+
+class PromptCache:
+    """Renders prompt templates with a cached, byte-stable static prefix.
+
+    Templates opt in by wrapping their leading, turn-independent part in
+    ``{% block static %}`` and the remainder in ``{% block dynamic %}``. The static
+    block is rendered once per ``(template, owner, key)`` and reused; only the
+    dynamic block is rendered per turn. ``owner`` identifies the config the static
+    values come from (it is kept alive by the entry) and ``key`` the stage.
+    Templates without both blocks are rendered in full every time.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = Lock()
+
+    def render(self, template: Template, owner: Any, key: Hashable,
+               static_context: Dict[str, Any], dynamic_context: Dict[str, Any]) -> str:
+        if 'static' not in template.blocks or 'dynamic' not in template.blocks:
+            return template.render(**static_context, **dynamic_context)
+
+        context = {**static_context, **dynamic_context}
+        cache_key = (template, id(owner), key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            prefix = entry[0]
+            if prefix is None:
+                return template.render(**context)
+            return prefix + self._render_block(template, 'dynamic', context)
+
+        prompt = template.render(**context)
+        prefix = self._render_block(template, 'static', context)
+        # Only split templates whose blocks cover the whole output in order.
+        if prompt != prefix + self._render_block(template, 'dynamic', context):
+            prefix = None
+
+        with self._lock:
+            self._entries[cache_key] = (prefix, owner)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return prompt
+
+    def get_static_prefix(self, template: Template, owner: Any, key: Hashable) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get((template, id(owner), key))
+        return entry[0] if entry is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    @staticmethod
+    def _render_block(template: Template, name: str, context: Dict[str, Any]) -> str:
+        return ''.join(template.blocks[name](template.new_context(context)))
+
+
+default_prompt_cache = PromptCache()
@@ -1,26 +1,66 @@
-from typing import Dict, Any
-from ..llm.base import LLMInterface
+import asyncio
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Sequence, Union
+from ..llm.base import AsyncLLMInterface, LLMInterface, generate_async, generate_stream_async
 from ..knowledge_retriever.base import BaseKnowledgeRetriever
+from .budget import PromptBudget, PromptReport, Sections, history_items
+from .history import Turn
+from .prompt import PromptCache, default_prompt_cache
 from jinja2 import Template
 
 class RAG:
-    def __init__(self, llm: LLMInterface, config: Dict[str, Any], knowledge_retriever: BaseKnowledgeRetriever, template: Template):
+    def __init__(self, llm: Union[LLMInterface, AsyncLLMInterface], config: Dict[str, Any], knowledge_retriever: BaseKnowledgeRetriever, template: Template,
+                 prompt_cache: Optional[PromptCache] = None, prompt_budget: Optional[PromptBudget] = None):
         self.llm = llm
         self.config = config
         self.knowledge_retriever = knowledge_retriever
         self.template = template
+        self.prompt_cache = prompt_cache if prompt_cache is not None else default_prompt_cache
+        self.prompt_budget = prompt_budget if prompt_budget is not None else PromptBudget.from_config(config)
+        self.last_prompt_report: Optional[PromptReport] = None
 
-    def process_turn(self, user_input: str, conversation_history: str = "") -> str:
+    def process_turn(self, user_input: str, conversation_history: Union[str, Sequence[Turn]] = "") -> str:
+        prompt = self._render_prompt(user_input, conversation_history)
+        response = self.llm.generate(prompt)
+
+        return response
+
+    def process_turn_stream(self, user_input: str, conversation_history: Union[str, Sequence[Turn]] = "") -> Iterator[str]:
+        prompt = self._render_prompt(user_input, conversation_history)
+        yield from self.llm.generate_stream(prompt)
+
+    async def aprocess_turn(self, user_input: str, conversation_history: Union[str, Sequence[Turn]] = "") -> str:
+        prompt = self._render_prompt(user_input, conversation_history, await self._aretrieve(user_input))
+        return await generate_async(self.llm, prompt)
+
+    async def aprocess_turn_stream(self, user_input: str, conversation_history: Union[str, Sequence[Turn]] = "") -> AsyncIterator[str]:
+        prompt = self._render_prompt(user_input, conversation_history, await self._aretrieve(user_input))
+        async for chunk in generate_stream_async(self.llm, prompt):
+            yield chunk
+
+    async def _aretrieve(self, user_input: str) -> List[str]:
+        # Retrievers are synchronous and may search a large index; keep them off the event loop.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.knowledge_retriever.retrieve_passages, user_input)
+
+    def _render_prompt(self, user_input: str, conversation_history: Union[str, Sequence[Turn]],
+                       passages: Optional[List[str]] = None) -> str:
         # Retrieve relevant information
-        retrieved_information = self.knowledge_retriever.retrieve(user_input)
+        sections = {
+            'retrieved_information': passages if passages is not None else self.knowledge_retriever.retrieve_passages(user_input),
+            'conversation_history': history_items(conversation_history)
+        }
 
         # Generate response using LLM with the template
-        prompt = self.template.render(
-            persona=self.config['persona'],
-            retrieved_information=retrieved_information,
-            conversation_history=conversation_history,
-            user_message=user_input
-        )
-        response = self.llm.generate(prompt)
+        def render(kept: Sections) -> str:
+            return self.prompt_cache.render(
+                self.template, self.config, None,
+                static_context={'persona': self.config['persona']},
+                dynamic_context={
+                    'retrieved_information': ' '.join(kept['retrieved_information']),
+                    'conversation_history': ''.join(reversed(kept['conversation_history'])),
+                    'user_message': user_input
+                }
+            )
 
-        return response
\ No newline at end of file
+        prompt, self.last_prompt_report = self.prompt_budget.assemble(render, sections)
+        return prompt
\ No newline at end of file
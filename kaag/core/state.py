@@ -0,0 +1,152 @@
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+from collections.abc import MutableMapping
+import numpy as np
+
+class MetricSchema:
+    """Fixed slot layout for a graph's metrics.
+
+    ``metrics`` should be the compiled network's metric list, so a state's
+    vector can be handed to the transition engine as is.
+    """
+
+    __slots__ = ('metrics', 'index', 'initial')
+
+    def __init__(self, metrics: List[str], initial: Optional[Mapping[str, float]] = None):
+        self.metrics = metrics
+        self.index = {metric: i for i, metric in enumerate(metrics)}
+        # Metrics without an initial value start at 0, as a missing dict key used to read.
+        self.initial = np.array([float((initial or {}).get(metric, 0)) for metric in metrics], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.metrics)
+
+    def new_state(self) -> 'InteractionState':
+        return InteractionState(self, self.initial.copy())
+
+
+class InteractionState(MutableMapping):
+    """Per-session metric values in a float vector, plus free-form extra fields.
+
+    Behaves like the ``dict`` it replaces: metrics read back as plain floats
+    and any other key (``last_message``, analyzer outputs) goes to ``extras``.
+    Metrics always exist and cannot be deleted. ``vector`` may be a row of a
+    :class:`StateBank`.
+    """
+
+    __slots__ = ('schema', 'vector', 'extras', 'row')
+
+    def __init__(self, schema: MetricSchema, vector: np.ndarray, extras: Optional[Dict[str, Any]] = None,
+                 row: Optional[int] = None):
+        self.schema = schema
+        self.vector = vector
+        self.extras = extras if extras is not None else {}
+        self.row = row
+
+    @property
+    def metrics(self) -> List[str]:
+        return self.schema.metrics
+
+    def __getitem__(self, key: str) -> Any:
+        slot = self.schema.index.get(key)
+        if slot is not None:
+            return float(self.vector[slot])
+        return self.extras[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        slot = self.schema.index.get(key)
+        if slot is not None:
+            return float(self.vector[slot])
+        return self.extras.get(key, default)
+
+    def __setitem__(self, key: str, value: Any):
+        slot = self.schema.index.get(key)
+        if slot is not None:
+            self.vector[slot] = float(value)
+        else:
+            self.extras[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self.schema.index:
+            raise KeyError(f"Metric {key!r} cannot be deleted")
+        del self.extras[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.schema.index or key in self.extras
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.schema.metrics
+        yield from self.extras
+
+    def __len__(self) -> int:
+        return len(self.schema.metrics) + len(self.extras)
+
+    def update(self, other: Any = (), **kwargs):
+        items = other.items() if isinstance(other, Mapping) else other
+        index = self.schema.index
+        for key, value in list(items) + list(kwargs.items()):
+            slot = index.get(key)
+            if slot is not None:
+                self.vector[slot] = float(value)
+            else:
+                self.extras[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**dict(zip(self.schema.metrics, self.vector.tolist())), **self.extras}
+
+    def copy(self) -> 'InteractionState':
+        return InteractionState(self.schema, self.vector.copy(), dict(self.extras))
+
+    def __repr__(self) -> str:
+        return f"InteractionState({self.to_dict()!r})"
+
+
+class StateBank:
+    """Metric vectors of many sessions in one contiguous ``(capacity, metrics)`` array.
+
+    States allocated from the bank write straight into their row, so
+    ``vectors[rows]`` can be routed in one batch (see
+    ``GamifiedInteractionModel.select_next_nodes``). The array doubles when
+    full and live states are re-pointed at the new rows.
+    """
+
+    def __init__(self, schema: MetricSchema, capacity: int = 1024):
+        self.schema = schema
+        self.vectors = np.zeros((max(capacity, 1), len(schema)), dtype=np.float64)
+        self._states: List[Optional[InteractionState]] = [None] * len(self.vectors)
+        self._free = list(range(len(self.vectors) - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self.vectors) - len(self._free)
+
+    def allocate(self) -> InteractionState:
+        if not self._free:
+            self._grow()
+        row = self._free.pop()
+        self.vectors[row] = self.schema.initial
+        state = InteractionState(self.schema, self.vectors[row], row=row)
+        self._states[row] = state
+        return state
+
+    def release(self, state: InteractionState):
+        if state.row is None or self._states[state.row] is not state:
+            raise ValueError("State was not allocated from this bank")
+        # Detach the state with its own copy so it stays readable.
+        state.vector = state.vector.copy()
+        self._states[state.row] = None
+        self._free.append(state.row)
+        state.row = None
+
+    @property
+    def rows(self) -> np.ndarray:
+        return np.array([row for row, state in enumerate(self._states) if state is not None], dtype=np.int64)
+
+    def _grow(self):
+        old_size = len(self.vectors)
+        vectors = np.zeros((old_size * 2, len(self.schema)), dtype=np.float64)
+        vectors[:old_size] = self.vectors
+        self.vectors = vectors
+        for row, state in enumerate(self._states):
+            if state is not None:
+                state.vector = vectors[row]
+        self._states.extend([None] * old_size)
+        self._free.extend(range(old_size * 2 - 1, old_size - 1, -1))
@@ -0,0 +1,97 @@
+from collections import deque
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Tuple
+import numpy as np
+from .dbn import Bounds, CompiledTransitions
+
+class EdgeRegion(NamedTuple):
+    child: str
+    # The edge's bounds clipped to the metric domains; metrics left unconstrained are omitted.
+    bounds: Bounds
+    feasible: bool
+
+
+class FlowAnalysis(NamedTuple):
+    """Static reachability report for a compiled conversation flow.
+
+    Only edges whose bounds can be met inside the metric domains count as
+    transitions. Edges with a callable condition instead of bounds are assumed
+    feasible.
+    """
+    regions: Mapping[str, Tuple[EdgeRegion, ...]]
+    reachable_leaves: Mapping[str, FrozenSet[str]]
+    reachable: FrozenSet[str]
+    # Edges whose bounds are empty or fall outside the metric domains.
+    infeasible_edges: Tuple[Tuple[str, str], ...]
+    # Stages the initial node can never reach.
+    unreachable: Tuple[str, ...]
+    # Non-leaf stages without a feasible outgoing edge: once entered they are never left.
+    stuck: Tuple[str, ...]
+    # Stages that can be left but never lead to a leaf.
+    no_leaf: Tuple[str, ...]
+
+    @property
+    def ok(self) -> bool:
+        return not (self.infeasible_edges or self.unreachable or self.stuck or self.no_leaf)
+
+
+def analyze_flow(compiled: CompiledTransitions, initial_node: str,
+                 domains: Optional[Mapping[str, Tuple[float, float]]] = None) -> FlowAnalysis:
+    domains = domains or {}
+    metrics = compiled.metrics
+    domain_lower = np.array([domains.get(metric, (-np.inf, np.inf))[0] for metric in metrics], dtype=np.float64)
+    domain_upper = np.array([domains.get(metric, (-np.inf, np.inf))[1] for metric in metrics], dtype=np.float64)
+    region_lower = np.maximum(compiled.lower, domain_lower)
+    region_upper = np.minimum(compiled.upper, domain_upper)
+    feasible = np.all(region_lower <= region_upper, axis=1)
+
+    nodes = compiled.nodes
+    regions: Dict[str, Tuple[EdgeRegion, ...]] = {}
+    successors: List[List[int]] = [[] for _ in nodes]
+    predecessors: List[List[int]] = [[] for _ in nodes]
+    infeasible_edges = []
+    for node, name in enumerate(nodes):
+        node_regions = []
+        for edge in range(compiled.edge_ptr[node], compiled.edge_ptr[node + 1]):
+            child = int(compiled.edge_child[edge])
+            bounds = {
+                metric: (float(region_lower[edge, i]), float(region_upper[edge, i]))
+                for i, metric in enumerate(metrics)
+                if np.isfinite(compiled.lower[edge, i]) or np.isfinite(compiled.upper[edge, i])
+            }
+            node_regions.append(EdgeRegion(nodes[child], bounds, bool(feasible[edge])))
+            if feasible[edge]:
+                successors[node].append(child)
+                predecessors[child].append(node)
+            else:
+                infeasible_edges.append((name, nodes[child]))
+        regions[name] = tuple(node_regions)
+
+    # Walk backwards from every leaf to find which stages can end there.
+    reachable_leaves: Dict[str, set] = {name: set() for name in nodes}
+    for leaf in np.flatnonzero(compiled.is_leaf):
+        for node in _walk(int(leaf), predecessors):
+            reachable_leaves[nodes[node]].add(nodes[leaf])
+
+    reachable = (frozenset(nodes[node] for node in _walk(compiled.node_index[initial_node], successors))
+                 if initial_node in compiled.node_index else frozenset())
+    stuck = tuple(name for node, name in enumerate(nodes) if not compiled.is_leaf[node] and not successors[node])
+    return FlowAnalysis(
+        regions=regions,
+        reachable_leaves={name: frozenset(leaves) for name, leaves in reachable_leaves.items()},
+        reachable=reachable,
+        infeasible_edges=tuple(infeasible_edges),
+        unreachable=tuple(name for name in nodes if name not in reachable),
+        stuck=stuck,
+        no_leaf=tuple(name for name in nodes if not reachable_leaves[name] and name not in stuck)
+    )
+
+
+def _walk(start: int, neighbours: List[List[int]]) -> List[int]:
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for neighbour in neighbours[queue.popleft()]:
+            if neighbour not in seen:
+                seen.add(neighbour)
+                queue.append(neighbour)
+    return list(seen)
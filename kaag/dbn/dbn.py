@@ -1,15 +1,133 @@
-import networkx as nx
-from typing import Any, Callable, Dict, List
+import numpy as np
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .analysis import FlowAnalysis
+
+Bounds = Dict[str, Tuple[float, float]]
+
+class CompiledTransitions:
+    """Flat array form of a DynamicBayesianNetwork.
+
+    Edges are stored grouped by parent node (CSR style), so the outgoing edges of
+    node ``i`` occupy rows ``edge_ptr[i]:edge_ptr[i + 1]`` of the bound and
+    utility matrices. Conditions become per-metric ``[lower, upper]`` boxes and
+    linear utilities become coefficient rows, so every outgoing edge of a node is
+    checked and scored with one NumPy operation over the metric vector.
+    """
+
+    def __init__(self, nodes: List[str], metrics: List[str], is_leaf: np.ndarray,
+                 edge_ptr: np.ndarray, edge_child: np.ndarray,
+                 lower: np.ndarray, upper: np.ndarray,
+                 coefficients: np.ndarray, intercepts: np.ndarray,
+                 fallback_conditions: Dict[int, Callable[[Dict[str, Any]], bool]],
+                 fallback_utilities: Dict[int, Callable[[Dict[str, Any]], float]]):
+        self.nodes = nodes
+        self.metrics = metrics
+        self.node_index = {node: i for i, node in enumerate(nodes)}
+        self.metric_index = {metric: i for i, metric in enumerate(metrics)}
+        self.is_leaf = is_leaf
+        self.edge_ptr = edge_ptr
+        self.edge_child = edge_child
+        self.lower = lower
+        self.upper = upper
+        self.coefficients = coefficients
+        self.intercepts = intercepts
+        self.fallback_conditions = fallback_conditions
+        self.fallback_utilities = fallback_utilities
+
+    def state_vector(self, interaction_state: Dict[str, Any]) -> np.ndarray:
+        # States laid out for this metric list (see kaag.core.state) carry their vector.
+        if getattr(interaction_state, 'metrics', None) is self.metrics:
+            return interaction_state.vector
+        # Missing metrics read as 0, matching the dict based condition functions.
+        return np.fromiter(
+            (interaction_state.get(metric, 0) for metric in self.metrics),
+            dtype=np.float64,
+            count=len(self.metrics)
+        )
+
+    def evaluate(self, node: int, vector: np.ndarray,
+                 interaction_state: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the child indices and utilities of the enabled edges of ``node``."""
+        start, end = self.edge_ptr[node], self.edge_ptr[node + 1]
+        enabled = np.all((self.lower[start:end] <= vector) & (vector <= self.upper[start:end]), axis=1)
+        utilities = self.coefficients[start:end] @ vector + self.intercepts[start:end]
+
+        if self.fallback_conditions or self.fallback_utilities:
+            for edge in range(start, end):
+                condition = self.fallback_conditions.get(edge)
+                if condition is not None and enabled[edge - start]:
+                    enabled[edge - start] = condition(interaction_state)
+                utility = self.fallback_utilities.get(edge)
+                if utility is not None and enabled[edge - start]:
+                    utilities[edge - start] = utility(interaction_state)
+
+        return self.edge_child[start:end][enabled], utilities[enabled]
+
+    def evaluate_batch(self, nodes: np.ndarray, vectors: np.ndarray,
+                       interaction_states: Optional[Sequence[Dict[str, Any]]] = None
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Evaluate the outgoing edges of many (node, metric vector) pairs at once.
+
+        Returns ``(children, utilities, enabled)``, each of shape ``(N, D)`` where
+        ``D`` is the largest out-degree among ``nodes``; row ``n`` lists the edges
+        of ``nodes[n]`` padded with disabled slots. Fallback callables receive
+        ``interaction_states[n]`` when given, otherwise a dict built from the vector.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float64).reshape(len(nodes), len(self.metrics))
+        starts = self.edge_ptr[nodes]
+        degrees = self.edge_ptr[nodes + 1] - starts
+        width = int(degrees.max()) if len(nodes) else 0
+
+        valid = np.arange(width) < degrees[:, None]
+        edges = np.where(valid, starts[:, None] + np.arange(width), 0)
+        if not width:
+            return edges, np.zeros(edges.shape), valid
+
+        points = vectors[:, None, :]
+        enabled = valid & np.all((self.lower[edges] <= points) & (points <= self.upper[edges]), axis=2)
+        utilities = np.einsum('ndm,nm->nd', self.coefficients[edges], vectors) + self.intercepts[edges]
+
+        fallback_edges = set(self.fallback_conditions) | set(self.fallback_utilities)
+        if fallback_edges:
+            fallback = valid & np.isin(edges, list(fallback_edges))
+            states: Dict[int, Dict[str, Any]] = {}
+            for row, slot in zip(*np.nonzero(fallback)):
+                if not enabled[row, slot]:
+                    continue
+                state = states.get(row)
+                if state is None:
+                    state = interaction_states[row] if interaction_states is not None else dict(zip(self.metrics, vectors[row].tolist()))
+                    states[row] = state
+                edge = int(edges[row, slot])
+                condition = self.fallback_conditions.get(edge)
+                if condition is not None and not condition(state):
+                    enabled[row, slot] = False
+                    continue
+                utility = self.fallback_utilities.get(edge)
+                if utility is not None:
+                    utilities[row, slot] = utility(state)
+
+        return self.edge_child[edges], utilities, enabled
+
 
 class DynamicBayesianNetwork:
     def __init__(self):
+        # Imported here so that importing kaag does not pay for networkx until a network is built.
+        import networkx as nx
         self.graph = nx.DiGraph()
+        self.compiled: Optional[CompiledTransitions] = None
 
     def add_node(self, node_name: str, is_leaf: bool = False):
         self.graph.add_node(node_name, is_leaf=is_leaf)
+        self.compiled = None
 
-    def add_edge(self, parent: str, child: str, condition: Callable[[Dict[str, Any]], bool], utility: Callable[[Dict[str, Any]], float]):
-        self.graph.add_edge(parent, child, condition=condition, utility=utility)
+    def add_edge(self, parent: str, child: str, condition: Callable[[Dict[str, Any]], bool], utility: Callable[[Dict[str, Any]], float],
+                 bounds: Optional[Bounds] = None):
+        self.graph.add_edge(parent, child, condition=condition, utility=utility, bounds=bounds)
+        self.compiled = None
 
     def get_possible_transitions(self, current_node: str, interaction_state: Dict[str, Any]) -> List[str]:
         return [
@@ -20,5 +138,106 @@ class DynamicBayesianNetwork:
     def get_utility(self, parent: str, child: str, interaction_state: Dict[str, Any]) -> float:
         return self.graph[parent][child]['utility'](interaction_state)
 
+    def evaluate_transitions(self, current_node: str, interaction_state: Dict[str, Any]) -> Tuple[List[str], List[float]]:
+        """Return the enabled successors of ``current_node`` together with their utilities."""
+        if self.compiled is None:
+            possible_transitions = self.get_possible_transitions(current_node, interaction_state)
+            utilities = [
+                self.get_utility(current_node, next_node, interaction_state)
+                for next_node in possible_transitions
+            ]
+            return possible_transitions, utilities
+
+        compiled = self.compiled
+        children, utilities = compiled.evaluate(
+            compiled.node_index[current_node],
+            compiled.state_vector(interaction_state),
+            interaction_state
+        )
+        return [compiled.nodes[child] for child in children], utilities.tolist()
+
+    def analyze(self, initial_node: str, domains: Optional[Dict[str, Tuple[float, float]]] = None) -> 'FlowAnalysis':
+        """Report infeasible edges, reachable leaves and dead stages; see :func:`analyze_flow`.
+
+        ``domains`` gives the ``(min, max)`` range each metric can take.
+        """
+        from .analysis import analyze_flow
+        compiled = self.compiled if self.compiled is not None else self.compile()
+        return analyze_flow(compiled, initial_node, domains)
+
     def is_leaf_node(self, node: str) -> bool:
-        return self.graph.nodes[node].get('is_leaf', False)
\ No newline at end of file
+        return self.graph.nodes[node].get('is_leaf', False)
+
+    def compile(self, metrics: Sequence[str] = ()) -> CompiledTransitions:
+        """Flatten the graph into a :class:`CompiledTransitions` and use it for routing.
+
+        ``metrics`` fixes the order of the metric vector; metrics referenced only by
+        edge bounds are appended after them. Edges added without ``bounds`` keep
+        their condition callable, and utilities without a ``linear``
+        ``(coefficients, intercept)`` attribute (which :class:`CompiledExpression`
+        provides for affine expressions) keep their utility callable; both are
+        evaluated per edge as a fallback.
+        """
+        metric_names = list(metrics)
+        for _, _, data in self.graph.edges(data=True):
+            linear = getattr(data['utility'], 'linear', None)
+            utility_metrics = sorted(linear[0]) if linear is not None else []
+            for metric in list(data.get('bounds') or {}) + utility_metrics:
+                if metric not in metric_names:
+                    metric_names.append(metric)
+        metric_index = {metric: i for i, metric in enumerate(metric_names)}
+
+        nodes = list(self.graph.nodes)
+        n_edges = self.graph.number_of_edges()
+        n_metrics = len(metric_names)
+
+        is_leaf = np.array([self.is_leaf_node(node) for node in nodes], dtype=bool)
+        edge_ptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        edge_child = np.zeros(n_edges, dtype=np.int64)
+        lower = np.full((n_edges, n_metrics), -np.inf)
+        upper = np.full((n_edges, n_metrics), np.inf)
+        coefficients = np.zeros((n_edges, n_metrics))
+        intercepts = np.zeros(n_edges)
+        fallback_conditions = {}
+        fallback_utilities = {}
+
+        node_index = {node: i for i, node in enumerate(nodes)}
+        edge = 0
+        for i, node in enumerate(nodes):
+            for child in self.graph.successors(node):
+                data = self.graph[node][child]
+                edge_child[edge] = node_index[child]
+
+                if data.get('bounds') is None:
+                    fallback_conditions[edge] = data['condition']
+                else:
+                    for metric, (min_value, max_value) in data['bounds'].items():
+                        lower[edge, metric_index[metric]] = min_value
+                        upper[edge, metric_index[metric]] = max_value
+
+                linear = _linear_form(data['utility'], metric_names)
+                if linear is None:
+                    fallback_utilities[edge] = data['utility']
+                else:
+                    coefficients[edge], intercepts[edge] = linear
+                edge += 1
+            edge_ptr[i + 1] = edge
+
+        self.compiled = CompiledTransitions(
+            nodes, metric_names, is_leaf, edge_ptr, edge_child, lower, upper,
+            coefficients, intercepts, fallback_conditions, fallback_utilities
+        )
+        return self.compiled
+
+
+def _linear_form(utility: Callable[[Dict[str, Any]], float], metrics: List[str]) -> Optional[Tuple[np.ndarray, float]]:
+    # Only utilities that declare their affine form are compiled; a callable that merely
+    # looks linear at a few points may be piecewise, so it is always called as is.
+    linear = getattr(utility, 'linear', None)
+    if linear is None:
+        return None
+    coefficients, intercept = linear
+    vector = np.zeros(len(metrics))
+    for metric, value in coefficients.items():
+        vector[metrics.index(metric)] = value
+    return vector, float(intercept)
@@ -1,3 +1,9 @@
 from .gim import GamifiedInteractionModel
+from .policies import (
+    SelectionPolicy, GreedyPolicy, SoftmaxPolicy, EpsilonGreedyPolicy, UCBPolicy, create_policy
+)
 
-__all__ = ['GamifiedInteractionModel']
\ No newline at end of file
+__all__ = [
+    'GamifiedInteractionModel', 'SelectionPolicy', 'GreedyPolicy', 'SoftmaxPolicy',
+    'EpsilonGreedyPolicy', 'UCBPolicy', 'create_policy'
+]
\ No newline at end of file
@@ -1,34 +1,66 @@
-from typing import Dict, Any
-import math
+from typing import Dict, Any, Optional, Sequence
 import random
+import numpy as np
+from .policies import SelectionPolicy, create_policy
 
 class GamifiedInteractionModel:
-    def __init__(self, dbn: 'DynamicBayesianNetwork'):
+    def __init__(self, dbn: 'DynamicBayesianNetwork', policy: Optional[SelectionPolicy] = None,
+                 seed: Optional[int] = None):
         self.dbn = dbn
+        self.policy = policy if policy is not None else create_policy()
+        self.random = random.Random(seed)
 
     def select_next_node(self, current_node: str, interaction_state: Dict[str, Any]) -> str:
         if self.dbn.is_leaf_node(current_node):
             return current_node
 
-        possible_transitions = self.dbn.get_possible_transitions(current_node, interaction_state)
+        possible_transitions, utilities = self.dbn.evaluate_transitions(current_node, interaction_state)
         if not possible_transitions:
             return current_node
 
-        utilities = [
-            self.dbn.get_utility(current_node, next_node, interaction_state)
-            for next_node in possible_transitions
-        ]
+        return possible_transitions[self.policy.select(current_node, possible_transitions, utilities, self.random)]
 
-        # Softmax selection with temperature
-        temperature = 0.5  # Adjust this value to control randomness
-        exp_utilities = [math.exp(u / temperature) for u in utilities]
-        total = sum(exp_utilities)
-        probabilities = [eu / total for eu in exp_utilities]
+    def select_next_nodes(self, current_nodes: np.ndarray, vectors: np.ndarray,
+                          rng: Optional[np.random.Generator] = None,
+                          interaction_states: Optional[Sequence[Dict[str, Any]]] = None,
+                          chunk_size: int = 65536) -> np.ndarray:
+        """Vectorized :meth:`select_next_node` for many sessions.
 
-        selected_node = random.choices(possible_transitions, weights=probabilities, k=1)[0]
+        ``current_nodes`` holds node indices and ``vectors`` the matching metric
+        vectors, both in the order of ``dbn.compiled`` (``nodes`` and ``metrics``).
+        Returns the next node index per session; leaves and sessions without an
+        enabled transition stay put. Pass a seeded ``rng`` for reproducible runs.
+        """
+        compiled = self.dbn.compiled
+        if compiled is None:
+            raise ValueError("The network must be compiled before selecting transitions in batch")
+        rng = rng if rng is not None else np.random.default_rng()
+        current_nodes = np.asarray(current_nodes, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float64).reshape(len(current_nodes), len(compiled.metrics))
 
-        # Add some randomness to occasionally explore non-optimal paths
-        if random.random() < 0.1:  # 10% chance to explore
-            return random.choice(possible_transitions)
+        # Draw every session's random numbers up front so results do not depend on chunk_size.
+        draws = rng.random((self.policy.num_draws, len(current_nodes)))
+        next_nodes = current_nodes.copy()
+        for start in range(0, len(current_nodes), chunk_size):
+            end = start + chunk_size
+            states = interaction_states[start:end] if interaction_states is not None else None
+            next_nodes[start:end] = self._select_chunk(
+                compiled, current_nodes[start:end], vectors[start:end], draws[:, start:end], states
+            )
+        return next_nodes
 
-        return selected_node
\ No newline at end of file
+    def _select_chunk(self, compiled, nodes: np.ndarray, vectors: np.ndarray, draws: np.ndarray,
+                      interaction_states: Optional[Sequence[Dict[str, Any]]]) -> np.ndarray:
+        children, utilities, enabled = compiled.evaluate_batch(nodes, vectors, interaction_states)
+        enabled &= ~compiled.is_leaf[nodes][:, None]
+        active = enabled.any(axis=1)
+        result = nodes.copy()
+        if not active.any():
+            return result
+
+        children = children[active]
+        choice = self.policy.select_batch(
+            compiled, nodes[active], children, utilities[active], enabled[active], draws[:, active]
+        )
+        result[active] = children[np.arange(len(choice)), choice]
+        return result
@@ -0,0 +1,174 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, Optional, Sequence, Type
+import math
+import random
+import threading
+import numpy as np
+
+class SelectionPolicy(ABC):
+    """Chooses one of a node's enabled transitions from their utilities.
+
+    ``select`` serves one session per turn and consumes randomness from a
+    ``random.Random``. ``select_batch`` serves many sessions as padded
+    ``(N, D)`` arrays and reads ``num_draws`` uniform numbers per session from
+    ``draws`` (shape ``(num_draws, N)``); every row has at least one enabled slot.
+    """
+
+    num_draws = 0
+
+    @abstractmethod
+    def select(self, node: str, children: Sequence[str], utilities: Sequence[float], rng: random.Random) -> int:
+        """Return the index into ``children`` of the selected transition."""
+
+    @abstractmethod
+    def select_batch(self, compiled, nodes: np.ndarray, children: np.ndarray, utilities: np.ndarray,
+                     enabled: np.ndarray, draws: np.ndarray) -> np.ndarray:
+        """Return the selected slot per row."""
+
+
+class GreedyPolicy(SelectionPolicy):
+    def select(self, node: str, children: Sequence[str], utilities: Sequence[float], rng: random.Random) -> int:
+        return max(range(len(utilities)), key=utilities.__getitem__)
+
+    def select_batch(self, compiled, nodes, children, utilities, enabled, draws):
+        return np.argmax(np.where(enabled, utilities, -np.inf), axis=1)
+
+
+class SoftmaxPolicy(SelectionPolicy):
+    """Samples in proportion to ``exp(utility / temperature)``.
+
+    With probability ``exploration_rate`` a uniformly random transition is taken
+    instead. The row maximum is subtracted before exponentiating, so utilities of
+    any magnitude stay finite.
+    """
+
+    num_draws = 3
+
+    def __init__(self, temperature: float = 0.5, exploration_rate: float = 0.1):
+        if temperature <= 0:
+            raise ValueError("temperature must be positive; use GreedyPolicy for deterministic selection")
+        self.temperature = temperature
+        self.exploration_rate = exploration_rate
+
+    def select(self, node: str, children: Sequence[str], utilities: Sequence[float], rng: random.Random) -> int:
+        if len(utilities) == 1:
+            return 0
+        if self.exploration_rate and rng.random() < self.exploration_rate:
+            return rng.randrange(len(utilities))
+        top = max(utilities)
+        weights = [math.exp((u - top) / self.temperature) for u in utilities]
+        target = rng.random() * sum(weights)
+        for i, weight in enumerate(weights):
+            target -= weight
+            if target < 0:
+                return i
+        return len(weights) - 1
+
+    def select_batch(self, compiled, nodes, children, utilities, enabled, draws):
+        sample_draws, explore_draws, pick_draws = draws
+        # Invert the cumulative weights of each row.
+        logits = np.where(enabled, utilities / self.temperature, -np.inf)
+        weights = np.exp(logits - logits.max(axis=1, keepdims=True))
+        cumulative = np.cumsum(weights, axis=1)
+        targets = (1.0 - sample_draws) * cumulative[:, -1]
+        choice = np.minimum((cumulative < targets[:, None]).sum(axis=1), enabled.shape[1] - 1)
+
+        explore = explore_draws < self.exploration_rate
+        if explore.any():
+            choice[explore] = _uniform_slots(enabled[explore], pick_draws[explore])
+        return choice
+
+
+class EpsilonGreedyPolicy(SelectionPolicy):
+    """Takes the best transition, or a uniformly random one with probability ``epsilon``."""
+
+    num_draws = 2
+
+    def __init__(self, epsilon: float = 0.1):
+        self.epsilon = epsilon
+
+    def select(self, node: str, children: Sequence[str], utilities: Sequence[float], rng: random.Random) -> int:
+        if rng.random() < self.epsilon:
+            return rng.randrange(len(utilities))
+        return max(range(len(utilities)), key=utilities.__getitem__)
+
+    def select_batch(self, compiled, nodes, children, utilities, enabled, draws):
+        explore_draws, pick_draws = draws
+        choice = np.argmax(np.where(enabled, utilities, -np.inf), axis=1)
+        explore = explore_draws < self.epsilon
+        if explore.any():
+            choice[explore] = _uniform_slots(enabled[explore], pick_draws[explore])
+        return choice
+
+
+class UCBPolicy(SelectionPolicy):
+    """Adds an exploration bonus to rarely taken transitions (UCB1 style).
+
+    Scores are ``utility + c * sqrt(ln(visits(node) + 1) / (visits(edge) + 1))``
+    and the best score wins. Visit counts are kept on the policy, so sessions
+    sharing a graph also share what has been explored. A batch is scored with
+    the counts from before the batch.
+    """
+
+    def __init__(self, c: float = 1.0):
+        self.c = c
+        self.node_visits: Counter = Counter()
+        self.edge_visits: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def select(self, node: str, children: Sequence[str], utilities: Sequence[float], rng: random.Random) -> int:
+        with self._lock:
+            log_visits = math.log(self.node_visits[node] + 1)
+            scores = [
+                utility + self.c * math.sqrt(log_visits / (self.edge_visits[node, child] + 1))
+                for child, utility in zip(children, utilities)
+            ]
+            choice = max(range(len(scores)), key=scores.__getitem__)
+            self.node_visits[node] += 1
+            self.edge_visits[node, children[choice]] += 1
+        return choice
+
+    def select_batch(self, compiled, nodes, children, utilities, enabled, draws):
+        names = compiled.nodes
+        with self._lock:
+            node_visits = np.array([self.node_visits[names[node]] for node in nodes], dtype=np.float64)
+            edge_visits = np.zeros(children.shape)
+            for row, slot in zip(*np.nonzero(enabled)):
+                edge_visits[row, slot] = self.edge_visits[names[nodes[row]], names[children[row, slot]]]
+            scores = utilities + self.c * np.sqrt(np.log(node_visits + 1)[:, None] / (edge_visits + 1))
+            choice = np.argmax(np.where(enabled, scores, -np.inf), axis=1)
+
+            self.node_visits.update(names[node] for node in nodes)
+            self.edge_visits.update(
+                (names[node], names[child]) for node, child in zip(nodes, children[np.arange(len(choice)), choice])
+            )
+        return choice
+
+
+POLICIES: Dict[str, Type[SelectionPolicy]] = {
+    'greedy': GreedyPolicy,
+    'softmax': SoftmaxPolicy,
+    'epsilon_greedy': EpsilonGreedyPolicy,
+    'ucb': UCBPolicy,
+}
+
+def create_policy(config: Optional[Dict[str, Any]] = None) -> SelectionPolicy:
+    """Build a policy from a config mapping such as ``{'type': 'softmax', 'temperature': 0.5}``.
+
+    Without a config this is the historical behaviour: :class:`SoftmaxPolicy` with
+    its defaults, a temperature of 0.5 and 10% uniform exploration.
+    """
+    if not config:
+        return SoftmaxPolicy()
+    params = dict(config)
+    policy_type = params.pop('type', 'softmax')
+    if policy_type not in POLICIES:
+        raise ValueError(f"Unknown selection policy {policy_type!r}; expected one of {sorted(POLICIES)}")
+    return POLICIES[policy_type](**params)
+
+
+def _uniform_slots(enabled: np.ndarray, draws: np.ndarray) -> np.ndarray:
+    # The k-th enabled slot of each row, with k drawn uniformly.
+    picks = (draws * enabled.sum(axis=1)).astype(np.int64)
+    return np.argmax(np.cumsum(enabled, axis=1) > picks[:, None], axis=1)
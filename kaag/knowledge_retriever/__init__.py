@@ -1,4 +1,40 @@
-from .base import BaseKnowledgeRetriever
-from .text_file import TextFileKnowledgeRetriever
+"""Knowledge retrievers. Retrievers backed by scikit-learn or SciPy import them only when first used."""
+from typing import TYPE_CHECKING
+from ..utils.lazy import lazy_exports
 
-__all__ = ['BaseKnowledgeRetriever', 'TextFileKnowledgeRetriever']
\ No newline at end of file
+if TYPE_CHECKING:
+    from .base import BaseKnowledgeRetriever
+    from .cache import CachedKnowledgeRetriever
+    from .dense import DenseIndex, DenseKnowledgeRetriever
+    from .ingest import Chunker, build_dense_index, build_tfidf_index, ingest_paths
+    from .store import TextStore
+    from .tfidf_index import TfidfIndex
+    from .text_file import TextFileKnowledgeRetriever
+
+__all__ = [
+    'BaseKnowledgeRetriever',
+    'CachedKnowledgeRetriever',
+    'DenseIndex',
+    'DenseKnowledgeRetriever',
+    'Chunker',
+    'build_dense_index',
+    'build_tfidf_index',
+    'ingest_paths',
+    'TextStore',
+    'TfidfIndex',
+    'TextFileKnowledgeRetriever',
+]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BaseKnowledgeRetriever': '.base',
+    'CachedKnowledgeRetriever': '.cache',
+    'DenseIndex': '.dense',
+    'DenseKnowledgeRetriever': '.dense',
+    'Chunker': '.ingest',
+    'build_dense_index': '.ingest',
+    'build_tfidf_index': '.ingest',
+    'ingest_paths': '.ingest',
+    'TextStore': '.store',
+    'TfidfIndex': '.tfidf_index',
+    'TextFileKnowledgeRetriever': '.text_file',
+})
@@ -1,6 +1,23 @@
 from abc import ABC, abstractmethod
+from typing import List, Sequence
 
 class BaseKnowledgeRetriever(ABC):
     @abstractmethod
     def retrieve(self, query: str) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    def retrieve_batch(self, queries: Sequence[str]) -> List[str]:
+        return [self.retrieve(query) for query in queries]
+
+    def retrieve_passages(self, query: str) -> List[str]:
+        # Best match first; retrievers that rank separate passages should return them individually.
+        result = self.retrieve(query)
+        return [result] if result else []
+
+    def retrieve_passages_batch(self, queries: Sequence[str]) -> List[List[str]]:
+        return [self.retrieve_passages(query) for query in queries]
+
+    @property
+    def version(self) -> int:
+        # Retrievers whose corpus can change must bump this so caches are invalidated.
+        return 0
\ No newline at end of file
@@ -0,0 +1,109 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from .base import BaseKnowledgeRetriever
+
+_WHITESPACE = re.compile(r'\s+')
+
+class CachedKnowledgeRetriever(BaseKnowledgeRetriever):
+    """Thread-safe LRU cache of retrieval results keyed by normalized query text.
+
+    The cache is cleared whenever the wrapped retriever's ``version`` changes,
+    e.g. after documents are appended to its index.
+    """
+
+    def __init__(self, retriever: BaseKnowledgeRetriever, maxsize: int = 10000):
+        self.retriever = retriever
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[Any, float]]' = OrderedDict()
+        self._cached_version = retriever.version
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+
+    @property
+    def version(self) -> int:
+        return self.retriever.version
+
+    def retrieve(self, query: str) -> str:
+        return self.retrieve_batch([query])[0]
+
+    def retrieve_batch(self, queries: Sequence[str]) -> List[str]:
+        return self._lookup('text', queries, self.retriever.retrieve_batch)
+
+    def retrieve_passages(self, query: str) -> List[str]:
+        return self.retrieve_passages_batch([query])[0]
+
+    def retrieve_passages_batch(self, queries: Sequence[str]) -> List[List[str]]:
+        return [list(passages) for passages in self._lookup('passages', queries, self.retriever.retrieve_passages_batch)]
+
+    def _lookup(self, kind: str, queries: Sequence[str], compute: Callable[[List[str]], List[Any]]) -> List[Any]:
+        keys = [(kind, _normalize_query(query)) for query in queries]
+        results: Dict[Tuple[str, str], Any] = {}
+        with self._lock:
+            self._check_version()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    results[key] = entry[0]
+                    self.hits += 1
+                    self.saved_seconds += entry[1]
+
+        # The normalized text is only the cache key; the first original spelling is what gets retrieved.
+        missing: Dict[Tuple[str, str], str] = {}
+        for key, query in zip(keys, queries):
+            if key not in results:
+                missing.setdefault(key, query)
+        if missing:
+            version = self.retriever.version
+            start = time.perf_counter()
+            retrieved = compute(list(missing.values()))
+            if kind == 'passages':
+                retrieved = [tuple(passages) for passages in retrieved]
+            latency = (time.perf_counter() - start) / len(missing)
+            with self._lock:
+                self.misses += len(missing)
+                # Do not store results computed against an index that changed meanwhile.
+                if version == self.retriever.version:
+                    self._check_version()
+                    for key, result in zip(missing, retrieved):
+                        self._entries[key] = (result, latency)
+                        self._entries.move_to_end(key)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            results.update(zip(missing, retrieved))
+
+        return [results[key] for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'saved_seconds': self.saved_seconds,
+            }
+
+    def _check_version(self):
+        version = self.retriever.version
+        if version != self._cached_version:
+            self._entries.clear()
+            self._cached_version = version
+            self.invalidations += 1
+
+
+def _normalize_query(query: str) -> str:
+    return _WHITESPACE.sub(' ', query).strip().casefold()
\ No newline at end of file
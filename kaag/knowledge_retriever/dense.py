@@ -0,0 +1,266 @@
+import os
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from .base import BaseKnowledgeRetriever
+from .store import TextStore, _read, _read_meta, _read_texts, _write, _write_meta, _write_texts
+
+FORMAT_VERSION = 1
+
+Embedder = Callable[[Sequence[str]], np.ndarray]
+
+class SentenceTransformerEmbedder:
+    """Embeds texts with a ``sentence-transformers`` model, loaded on first use."""
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', batch_size: int = 64):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return np.asarray(self._model.encode(list(texts), batch_size=self.batch_size), dtype=np.float32)
+
+
+class DenseIndex:
+    """Compact inverted-file (IVF) index over unit-normalized embeddings.
+
+    Vectors are stored as float16, or as int8 with one scale per row, and can be
+    saved to flat files that are memory-mapped on load. Vectors are clustered
+    around ``nlist`` k-means centroids; a query scans only the rows of its
+    ``nprobe`` closest clusters, trading recall for latency. ``nlist=0`` (or
+    ``nprobe >= nlist``) scans every row.
+    """
+
+    def __init__(self, vectors: np.ndarray, scales: Optional[np.ndarray], centroids: np.ndarray,
+                 assignments: np.ndarray, texts: TextStore, version: int = 0, path: Optional[str] = None):
+        self.vectors = vectors
+        self.scales = scales
+        self.centroids = centroids
+        self.assignments = assignments
+        self.texts = texts
+        self.version = version
+        self.path = path
+        self._build_lists()
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, texts: Sequence[str], nlist: int = 0, dtype: str = 'float16',
+              n_iter: int = 20, seed: int = 0) -> 'DenseIndex':
+        if dtype not in ('float16', 'int8'):
+            raise ValueError(f"Unsupported vector dtype {dtype!r}; use 'float16' or 'int8'")
+        embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+        nlist = min(nlist, len(embeddings))
+        centroids = _kmeans(embeddings, nlist, n_iter, seed) if nlist > 0 else np.zeros((0, embeddings.shape[1]), np.float32)
+        vectors, scales = _quantize(embeddings, dtype)
+        return cls(vectors, scales, centroids, _assign(embeddings, centroids), TextStore.from_texts(texts))
+
+    @property
+    def dtype(self) -> str:
+        return 'int8' if self.scales is not None else 'float16'
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def search_batch(self, queries: np.ndarray, top_k: int, nprobe: int = 8) -> List[List[Tuple[int, float]]]:
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        nlist = len(self.centroids)
+        results = []
+        for query in queries:
+            if nlist == 0 or nprobe >= nlist:
+                rows = None
+            else:
+                probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+                rows = np.concatenate([self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probes])
+            results.append(self._top_k(query, rows, top_k))
+        return results
+
+    def search_exact(self, queries: np.ndarray, top_k: int) -> List[List[Tuple[int, float]]]:
+        return self.search_batch(queries, top_k, nprobe=len(self.centroids))
+
+    def append(self, embeddings: np.ndarray, texts: Sequence[str]):
+        self.extend([(embeddings, texts)])
+
+    def extend(self, batches: Iterable[Tuple[np.ndarray, Sequence[str]]]):
+        """Append batches of ``(embeddings, texts)``, rebuilding the inverted lists once at the end.
+
+        An index backed by files streams each batch to them; otherwise the
+        batches are collected and concatenated once.
+        """
+        parts = []
+        added_rows = 0
+        text_end = int(self.texts.offsets[-1])
+        for embeddings, texts in batches:
+            if not len(texts):
+                continue
+            embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+            vectors, scales = _quantize(embeddings, self.dtype)
+            assignments = _assign(embeddings, self.centroids)
+            added = TextStore.from_texts(texts)
+            added_rows += len(added)
+            if self.path is not None:
+                _write(self.path, 'vectors.bin', vectors, append=True)
+                if scales is not None:
+                    _write(self.path, 'scales.bin', scales, append=True)
+                _write(self.path, 'assignments.bin', assignments, append=True)
+                _write_texts(self.path, added, append_after=text_end)
+                text_end += int(added.offsets[-1])
+            else:
+                parts.append((vectors, scales, assignments, added))
+        if not added_rows:
+            return
+
+        self.version += 1
+        if self.path is not None:
+            self._write_meta(self.path)
+            self._map(self.path)
+        else:
+            self.vectors = np.concatenate([self.vectors] + [part[0] for part in parts])
+            if self.scales is not None:
+                self.scales = np.concatenate([self.scales] + [part[1] for part in parts])
+            self.assignments = np.concatenate([self.assignments] + [part[2] for part in parts])
+            self.texts = TextStore.concatenate([self.texts] + [part[3] for part in parts])
+        self._build_lists()
+
+    def save(self, path: str):
+        if self.path is not None and os.path.abspath(path) == os.path.abspath(self.path):
+            self._write_meta(path)
+            return
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'centroids.npy'), self.centroids)
+        _write(path, 'vectors.bin', self.vectors)
+        _write(path, 'scales.bin', self.scales if self.scales is not None else np.zeros(0, np.float32))
+        _write(path, 'assignments.bin', np.asarray(self.assignments, dtype=np.int32))
+        _write_texts(path, self.texts)
+        self._write_meta(path)
+        self.path = path
+        self._map(path)
+
+    @classmethod
+    def load(cls, path: str) -> 'DenseIndex':
+        meta = _read_meta(path, FORMAT_VERSION, 'dense')
+        vectors, scales, assignments, texts = cls._read_arrays(path, meta['dtype'], meta['dim'])
+        centroids = np.load(os.path.join(path, 'centroids.npy'))
+        return cls(vectors, scales, centroids, assignments, texts, meta['version'], path)
+
+    def _map(self, path: str):
+        self.vectors, self.scales, self.assignments, self.texts = self._read_arrays(path, self.dtype, self.vectors.shape[1])
+
+    @staticmethod
+    def _read_arrays(path: str, dtype: str, dim: int):
+        vectors = _read(path, 'vectors.bin', np.int8 if dtype == 'int8' else np.float16).reshape(-1, dim)
+        scales = _read(path, 'scales.bin', np.float32) if dtype == 'int8' else None
+        assignments = _read(path, 'assignments.bin', np.int32)
+        return vectors, scales, assignments, _read_texts(path)
+
+    def _write_meta(self, path: str):
+        _write_meta(path, {'format': FORMAT_VERSION, 'version': self.version, 'dtype': self.dtype,
+                           'dim': int(self.vectors.shape[1])})
+
+    def _build_lists(self):
+        # Inverted lists as one permutation of row ids grouped by cluster (CSR style).
+        nlist = len(self.centroids)
+        self.list_rows = np.argsort(self.assignments, kind='stable').astype(np.int64)
+        self.list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+        if nlist:
+            np.cumsum(np.bincount(self.assignments, minlength=nlist), out=self.list_offsets[1:])
+
+    def _top_k(self, query: np.ndarray, rows: Optional[np.ndarray], top_k: int,
+               block_size: int = 65536) -> List[Tuple[int, float]]:
+        # Scored a block at a time, so only one block of a memory-mapped index is converted to float32.
+        count = len(self.vectors) if rows is None else len(rows)
+        best_ids = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, count, block_size):
+            end = min(start + block_size, count)
+            # Without a row list, contiguous slices of the memmap are read directly.
+            block = slice(start, end) if rows is None else rows[start:end]
+            ids = np.arange(start, end) if rows is None else block
+            scores = self.vectors[block].astype(np.float32) @ query
+            if self.scales is not None:
+                scores *= self.scales[block]
+            best_ids = np.concatenate([best_ids, ids])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > top_k:
+                keep = np.argpartition(-best_scores, top_k - 1)[:top_k]
+                best_ids, best_scores = best_ids[keep], best_scores[keep]
+        order = np.lexsort((best_ids, -best_scores))
+        return [(int(i), float(s)) for i, s in zip(best_ids[order], best_scores[order])]
+
+
+class DenseKnowledgeRetriever(BaseKnowledgeRetriever):
+    def __init__(self, index: DenseIndex, embedder: Optional[Embedder] = None, top_k: int = 3, nprobe: int = 8):
+        self.index = index
+        self.embedder = embedder if embedder is not None else SentenceTransformerEmbedder()
+        self.top_k = top_k
+        self.nprobe = nprobe
+
+    @classmethod
+    def from_texts(cls, texts: Sequence[str], embedder: Optional[Embedder] = None, top_k: int = 3,
+                   nlist: int = 0, nprobe: int = 8, dtype: str = 'float16') -> 'DenseKnowledgeRetriever':
+        embedder = embedder if embedder is not None else SentenceTransformerEmbedder()
+        index = DenseIndex.build(embedder(texts), texts, nlist=nlist, dtype=dtype)
+        return cls(index, embedder, top_k, nprobe)
+
+    @classmethod
+    def load(cls, index_path: str, embedder: Optional[Embedder] = None, top_k: int = 3, nprobe: int = 8) -> 'DenseKnowledgeRetriever':
+        return cls(DenseIndex.load(index_path), embedder, top_k, nprobe)
+
+    @property
+    def version(self) -> int:
+        return self.index.version
+
+    def add_documents(self, documents: Sequence[str]):
+        self.index.append(self.embedder(documents), documents)
+
+    def save(self, index_path: str):
+        self.index.save(index_path)
+
+    def retrieve(self, query: str) -> str:
+        return self.retrieve_batch([query])[0]
+
+    def retrieve_batch(self, queries: Sequence[str]) -> List[str]:
+        return [' '.join(passages) for passages in self.retrieve_passages_batch(queries)]
+
+    def retrieve_passages(self, query: str) -> List[str]:
+        return self.retrieve_passages_batch([query])[0]
+
+    def retrieve_passages_batch(self, queries: Sequence[str]) -> List[List[str]]:
+        matches = self.index.search_batch(self.embedder(queries), self.top_k, self.nprobe)
+        return [[self.index.texts[i] for i, _ in query_matches] for query_matches in matches]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    if dtype == 'float16':
+        return vectors.astype(np.float16), None
+    scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+    return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+    if not len(centroids):
+        return np.zeros(len(vectors), dtype=np.int32)
+    return np.concatenate([
+        np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), batch_size)
+    ]).astype(np.int32)
+
+
+def _kmeans(vectors: np.ndarray, k: int, n_iter: int, seed: int) -> np.ndarray:
+    # Spherical k-means on a sample; centroids stay unit length so dot products rank clusters.
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), k * 256), replace=False)]
+    centroids = sample[rng.choice(len(sample), size=k, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = np.bincount(labels, minlength=k) == 0
+        sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32)
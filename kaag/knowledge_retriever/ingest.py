@@ -0,0 +1,221 @@
+import heapq
+import os
+import re
+from collections import Counter
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Union
+import numpy as np
+import scipy.sparse as sp
+from .dense import DenseIndex, Embedder
+from .store import TextStore
+from .tfidf_index import TfidfIndex
+
+Paths = Union[str, Sequence[str]]
+
+_TOKEN = re.compile(r'\S+')
+_TRAILING_TOKEN = re.compile(r'\S+$')
+_LAST_SPACE = re.compile(r'\s(?=\S*$)')
+
+class Chunker:
+    """Splits text streams into overlapping windows of characters or tokens.
+
+    Files are read ``buffer_size`` characters at a time and only the current
+    window is kept in memory, so memory use does not depend on file size.
+    ``unit='char'`` windows end at the last whitespace in the window's second
+    half where possible; ``unit='token'`` windows count whitespace-separated
+    tokens and join them with single spaces.
+    """
+
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200, unit: str = 'char',
+                 buffer_size: int = 1 << 20, suffixes: Optional[Sequence[str]] = ('.txt', '.md')):
+        if unit not in ('char', 'token'):
+            raise ValueError(f"Unsupported chunk unit {unit!r}; use 'char' or 'token'")
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.unit = unit
+        self.buffer_size = buffer_size
+        self.suffixes = tuple(suffixes) if suffixes else None
+
+    def iter_files(self, paths: Paths) -> Iterator[str]:
+        for path in [paths] if isinstance(paths, str) else paths:
+            if os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(files):
+                        if self.suffixes is None or name.endswith(self.suffixes):
+                            yield os.path.join(root, name)
+            else:
+                yield path
+
+    def read_blocks(self, file_path: str) -> Iterator[str]:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+            while True:
+                block = file.read(self.buffer_size)
+                if not block:
+                    return
+                yield block
+
+    def chunk_paths(self, paths: Paths) -> Iterator[str]:
+        for file_path in self.iter_files(paths):
+            yield from self.chunk_blocks(self.read_blocks(file_path))
+
+    def chunk_blocks(self, blocks: Iterable[str]) -> Iterator[str]:
+        if self.unit == 'token':
+            return self._chunk_tokens(blocks)
+        return self._chunk_chars(blocks)
+
+    def _chunk_chars(self, blocks: Iterable[str]) -> Iterator[str]:
+        buffer = ''
+        start = 0
+        # End of the last window; text before it has already been emitted.
+        end = 0
+        for block in blocks:
+            buffer = buffer[start:] + block
+            end -= start
+            start = 0
+            while len(buffer) - start >= self.chunk_size:
+                end = start + self.chunk_size
+                match = _LAST_SPACE.search(buffer, start + self.chunk_size // 2, end)
+                if match is not None and match.start() - start > self.overlap:
+                    end = match.start()
+                chunk = buffer[start:end].strip()
+                if chunk:
+                    yield chunk
+                start = end - self.overlap
+        # The rest is only the last window's overlap unless new text follows it.
+        if buffer[end:].strip():
+            yield buffer[start:].strip()
+
+    def _chunk_tokens(self, blocks: Iterable[str]) -> Iterator[str]:
+        tokens: List[str] = []
+        start = 0
+        end = 0
+        carry = ''
+        step = self.chunk_size - self.overlap
+        for block in blocks:
+            text = carry + block
+            # A token touching the end of the block may continue in the next one.
+            match = _TRAILING_TOKEN.search(text)
+            carry = match.group() if match else ''
+            tokens = tokens[start:]
+            end -= start
+            start = 0
+            tokens.extend(_TOKEN.findall(text, 0, len(text) - len(carry)))
+            while len(tokens) - start >= self.chunk_size:
+                end = start + self.chunk_size
+                yield ' '.join(tokens[start:end])
+                start += step
+        tokens = tokens[start:] + _TOKEN.findall(carry)
+        if len(tokens) > end - start:
+            yield ' '.join(tokens)
+
+
+def iter_batches(chunks: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ingest_paths(paths: Paths, add: Callable[[List[str]], None], chunker: Optional[Chunker] = None,
+                 batch_size: int = 1024) -> int:
+    """Stream chunks from ``paths`` into ``add`` in batches; returns the chunk count.
+
+    ``add`` is typically ``TfidfIndex.append`` or a retriever's ``add_documents``.
+    """
+    chunker = chunker or Chunker()
+    count = 0
+    for batch in iter_batches(chunker.chunk_paths(paths), batch_size):
+        add(batch)
+        count += len(batch)
+    return count
+
+
+def build_tfidf_index(paths: Paths, index_path: Optional[str] = None, chunker: Optional[Chunker] = None,
+                      batch_size: int = 1024, min_df: int = 1, max_features: Optional[int] = None,
+                      **vectorizer_params) -> TfidfIndex:
+    """Build a :class:`TfidfIndex` from files in two streaming passes.
+
+    The first pass counts document frequencies to fix the vocabulary and IDF
+    weights (as scikit-learn computes them, honoring ``smooth_idf``); the
+    second vectorizes chunks in batches. With ``index_path`` the rows are
+    appended to the on-disk index as they are produced, so only the vocabulary
+    and one batch are held in memory. ``use_idf=False`` is not supported.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    if not vectorizer_params.get('use_idf', True):
+        raise ValueError("build_tfidf_index() stores IDF weights; use TfidfIndex.build() for use_idf=False")
+    chunker = chunker or Chunker()
+    analyzer = TfidfVectorizer(**vectorizer_params).build_analyzer()
+    document_frequency: Counter = Counter()
+    num_chunks = 0
+    for chunk in chunker.chunk_paths(paths):
+        document_frequency.update(set(analyzer(chunk)))
+        num_chunks += 1
+
+    counts = [(term, count) for term, count in document_frequency.items() if count >= min_df]
+    del document_frequency
+    if max_features is not None and len(counts) > max_features:
+        # The most frequent terms, ties broken alphabetically.
+        counts = heapq.nsmallest(max_features, counts, key=lambda item: (-item[1], item[0]))
+    if not counts:
+        raise ValueError("No terms found in the ingested documents")
+    counts.sort()
+    vocabulary = {term: i for i, (term, _) in enumerate(counts)}
+    df = np.array([count for _, count in counts], dtype=np.float64)
+    del counts
+    if vectorizer_params.get('smooth_idf', True):
+        idf = np.log((1 + num_chunks) / (1 + df)) + 1
+    else:
+        idf = np.log(num_chunks / df) + 1
+
+    index = TfidfIndex.from_vocabulary(vocabulary, idf, **vectorizer_params)
+    if index_path is not None:
+        index.save(index_path)
+        ingest_paths(paths, index.append, chunker, batch_size)
+        return index
+
+    # In memory, collect the batches and assemble once to avoid repeated copies.
+    rows, texts = [], []
+    for batch in iter_batches(chunker.chunk_paths(paths), batch_size):
+        rows.append(index.transform(batch))
+        texts.extend(batch)
+    if rows:
+        index.matrix = sp.vstack(rows, format='csr')
+        index.texts = TextStore.from_texts(texts)
+    return index
+
+
+def build_dense_index(paths: Paths, embedder: Embedder, index_path: Optional[str] = None,
+                      chunker: Optional[Chunker] = None, batch_size: int = 256, nlist: int = 0,
+                      dtype: str = 'float16', train_size: int = 50000) -> DenseIndex:
+    """Build a :class:`DenseIndex` from files, embedding chunks batch by batch.
+
+    The first ``train_size`` chunks train the IVF clusters; later chunks are
+    assigned to them and appended, to ``index_path`` if given.
+    """
+    chunker = chunker or Chunker()
+    batches = iter_batches(chunker.chunk_paths(paths), batch_size)
+
+    train_texts: List[str] = []
+    train_embeddings: List[np.ndarray] = []
+    for batch in batches:
+        train_texts.extend(batch)
+        train_embeddings.append(np.asarray(embedder(batch), dtype=np.float32))
+        if len(train_texts) >= train_size:
+            break
+    if not train_texts:
+        raise ValueError("No chunks found in the ingested documents")
+
+    index = DenseIndex.build(np.concatenate(train_embeddings), train_texts, nlist=nlist, dtype=dtype)
+    del train_texts, train_embeddings
+    if index_path is not None:
+        index.save(index_path)
+
+    index.extend((embedder(batch), batch) for batch in batches)
+    return index
@@ -0,0 +1,83 @@
+import json
+import os
+from typing import Any, Dict, Iterable, Sequence
+import numpy as np
+
+class TextStore(Sequence[str]):
+    """UTF-8 texts packed into one byte buffer plus an offsets array."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str]) -> 'TextStore':
+        encoded = [text.encode('utf-8') for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    @classmethod
+    def concatenate(cls, stores: Sequence['TextStore']) -> 'TextStore':
+        offsets = [stores[0].offsets]
+        end = stores[0].offsets[-1]
+        for store in stores[1:]:
+            offsets.append(store.offsets[1:] + end)
+            end += store.offsets[-1]
+        return cls(np.concatenate([store.data for store in stores]), np.concatenate(offsets))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("text index out of range")
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+
+def _write(path: str, name: str, array: np.ndarray, append: bool = False):
+    with open(os.path.join(path, name), 'ab' if append else 'wb') as f:
+        f.write(np.ascontiguousarray(array).tobytes())
+
+
+def _read(path: str, name: str, dtype) -> np.ndarray:
+    file_path = os.path.join(path, name)
+    # np.memmap cannot map empty files.
+    if os.path.getsize(file_path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(file_path, dtype=dtype, mode='r')
+
+
+def _write_texts(path: str, texts: TextStore, append_after: int = -1):
+    # With append_after set to the byte length already on disk, texts are appended.
+    if append_after < 0:
+        _write(path, 'texts.bin', np.asarray(texts.data, dtype=np.uint8))
+        _write(path, 'text_offsets.bin', np.asarray(texts.offsets, dtype=np.int64))
+    else:
+        _write(path, 'texts.bin', texts.data, append=True)
+        _write(path, 'text_offsets.bin', texts.offsets[1:] + append_after, append=True)
+
+
+def _read_texts(path: str) -> TextStore:
+    return TextStore(_read(path, 'texts.bin', np.uint8), _read(path, 'text_offsets.bin', np.int64))
+
+
+def _write_meta(path: str, meta: Dict[str, Any]):
+    # Written to a temporary file and renamed, so readers never see a partial file.
+    tmp_path = os.path.join(path, 'meta.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(path, 'meta.json'))
+
+
+def _read_meta(path: str, format_version: int, kind: str) -> Dict[str, Any]:
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta['format'] != format_version:
+        raise ValueError(f"Unsupported {kind} index format {meta['format']} in {path}")
+    return meta
+
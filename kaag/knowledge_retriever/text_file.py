@@ -1,24 +1,71 @@
+import os
 import re
-from typing import List, Tuple
+from typing import List, Optional, Sequence
 from .base import BaseKnowledgeRetriever
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+from .ingest import Chunker, build_tfidf_index
+from .tfidf_index import TfidfIndex
 
 class TextFileKnowledgeRetriever(BaseKnowledgeRetriever):
-    def __init__(self, file_path: str, top_k: int = 3):
-        with open(file_path, 'r') as file:
-            self.content = file.read()
-        self.sentences = re.split(r'(?<=[.!?])\s+', self.content)
-        self.vectorizer = TfidfVectorizer()
-        self.sentence_vectors = self.vectorizer.fit_transform(self.sentences)
+    def __init__(self, file_path: Optional[str] = None, top_k: int = 3, index_path: Optional[str] = None,
+                 chunker: Optional[Chunker] = None):
+        # A prebuilt index at index_path is loaded memory-mapped; otherwise the file
+        # is indexed and, if index_path is given, the index is saved there. With a
+        # chunker, file_path (a file or directory) is streamed in overlapping chunks
+        # instead of being read whole and split into sentences.
+        if index_path is not None and os.path.exists(os.path.join(index_path, 'meta.json')):
+            self.index = TfidfIndex.load(index_path)
+        elif file_path is not None and chunker is not None:
+            self.index = build_tfidf_index(file_path, index_path, chunker=chunker)
+        elif file_path is not None:
+            with open(file_path, 'r') as file:
+                content = file.read()
+            self.index = TfidfIndex.build(self.split_sentences(content))
+            if index_path is not None:
+                self.index.save(index_path)
+        else:
+            raise ValueError("Either file_path or an existing index_path is required")
         self.top_k = top_k
 
+    @staticmethod
+    def split_sentences(text: str) -> List[str]:
+        return re.split(r'(?<=[.!?])\s+', text)
+
+    @property
+    def sentences(self) -> Sequence[str]:
+        return self.index.texts
+
+    @property
+    def vectorizer(self):
+        return self.index.vectorizer
+
+    @property
+    def sentence_vectors(self):
+        return self.index.matrix
+
+    @property
+    def version(self) -> int:
+        return self.index.version
+
+    def add_documents(self, documents: Sequence[str]):
+        sentences = [sentence for document in documents for sentence in self.split_sentences(document)]
+        self.index.append(sentences)
+
+    def save(self, index_path: str):
+        self.index.save(index_path)
+
     def retrieve(self, query: str) -> str:
-        query_vector = self.vectorizer.transform([query])
-        similarities = cosine_similarity(query_vector, self.sentence_vectors)
-        
-        top_k_indices = np.argsort(similarities[0])[-self.top_k:][::-1]
-        relevant_sentences = [self.sentences[i] for i in top_k_indices]
-        
-        return ' '.join(relevant_sentences)
\ No newline at end of file
+        return self.retrieve_batch([query])[0]
+
+    def retrieve_batch(self, queries: Sequence[str]) -> List[str]:
+        return [' '.join(passages) for passages in self.retrieve_passages_batch(queries)]
+
+    def retrieve_passages(self, query: str) -> List[str]:
+        return self.retrieve_passages_batch([query])[0]
+
+    def retrieve_passages_batch(self, queries: Sequence[str]) -> List[List[str]]:
+        # Only sentences sharing a term with the query are returned, so a query
+        # with no match gets no passages rather than arbitrary sentences.
+        return [
+            [self.sentences[i] for i, _ in matches]
+            for matches in self.index.search_batch(queries, self.top_k)
+        ]
\ No newline at end of file
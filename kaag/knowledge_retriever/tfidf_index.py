@@ -0,0 +1,151 @@
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+from .store import TextStore, _read, _read_meta, _read_texts, _write, _write_meta, _write_texts
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+FORMAT_VERSION = 1
+
+class TfidfIndex:
+    """A fitted TF-IDF model with its L2-normalized document matrix and texts.
+
+    The index can be saved to a directory of flat binary files and loaded back
+    memory-mapped, without refitting. Documents appended later are vectorized
+    with the existing vocabulary and IDF weights (terms not in the vocabulary are
+    ignored); call :meth:`build` again to refit. An index loaded from (or saved
+    to) a directory appends to its files in place. ``version`` increases on
+    every change.
+    """
+
+    def __init__(self, vectorizer: 'TfidfVectorizer', matrix: sp.csr_matrix, texts: TextStore,
+                 vectorizer_params: Optional[Dict[str, Any]] = None, version: int = 0,
+                 path: Optional[str] = None):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.texts = texts
+        self.vectorizer_params = dict(vectorizer_params or {})
+        self.version = version
+        self.path = path
+
+    @classmethod
+    def build(cls, texts: Sequence[str], **vectorizer_params) -> 'TfidfIndex':
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = TfidfVectorizer(dtype=np.float32, **vectorizer_params)
+        matrix = vectorizer.fit_transform(texts).tocsr()
+        return cls(vectorizer, matrix, TextStore.from_texts(texts), vectorizer_params)
+
+    @classmethod
+    def from_vocabulary(cls, vocabulary: Dict[str, int], idf: np.ndarray, **vectorizer_params) -> 'TfidfIndex':
+        """Create an empty index around an already computed vocabulary and IDF."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = TfidfVectorizer(dtype=np.float32, vocabulary=vocabulary, **vectorizer_params)
+        vectorizer.idf_ = np.asarray(idf, dtype=np.float64)
+        matrix = sp.csr_matrix((0, len(vocabulary)), dtype=np.float32)
+        return cls(vectorizer, matrix, TextStore.from_texts([]), vectorizer_params)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def transform(self, texts: Sequence[str]) -> sp.csr_matrix:
+        return self.vectorizer.transform(texts).tocsr()
+
+    def search_batch(self, queries: Sequence[str], top_k: int) -> List[List[Tuple[int, float]]]:
+        """Return the ``top_k`` ``(row, score)`` matches per query, best first.
+
+        Rows are L2-normalized, so the sparse dot product already is the cosine
+        similarity. Only rows sharing a term with the query are candidates, and
+        they are narrowed with a partial selection before sorting.
+        """
+        if not len(queries) or top_k <= 0:
+            return [[] for _ in queries]
+        # (documents x queries) keeps the large matrix in CSR order; the transpose is small.
+        scores = (self.matrix @ self.transform(queries).T).T.tocsr()
+
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            documents = scores.indices[start:end]
+            values = scores.data[start:end]
+            candidates = np.flatnonzero(values > 0)
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-values[candidates], top_k - 1)[:top_k]]
+            order = candidates[np.lexsort((documents[candidates], -values[candidates]))]
+            results.append([(int(documents[i]), float(values[i])) for i in order])
+        return results
+
+    def append(self, texts: Sequence[str]):
+        if not texts:
+            return
+        rows = self.transform(texts)
+        self.version += 1
+        if self.path is not None:
+            self._append_files(self.path, rows, texts)
+            self._map(self.path)
+        else:
+            self.matrix = sp.vstack([self.matrix, rows], format='csr')
+            self.texts = TextStore.concatenate([self.texts, TextStore.from_texts(texts)])
+
+    def save(self, path: str):
+        if self.path is not None and os.path.abspath(path) == os.path.abspath(self.path):
+            # Already backed by these files; rewriting them would truncate our own mappings.
+            self._write_meta(path)
+            return
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, 'vocabulary.json'), 'w') as f:
+            json.dump({term: int(i) for term, i in self.vectorizer.vocabulary_.items()}, f)
+        np.save(os.path.join(path, 'idf.npy'), self.vectorizer.idf_)
+
+        matrix = self.matrix
+        _write(path, 'data.bin', np.asarray(matrix.data, dtype=np.float32))
+        _write(path, 'indices.bin', np.asarray(matrix.indices, dtype=np.int32))
+        _write(path, 'indptr.bin', np.asarray(matrix.indptr, dtype=np.int64))
+        _write_texts(path, self.texts)
+        self._write_meta(path)
+
+        self.path = path
+        self._map(path)
+
+    @classmethod
+    def load(cls, path: str) -> 'TfidfIndex':
+        meta = _read_meta(path, FORMAT_VERSION, 'TF-IDF')
+        with open(os.path.join(path, 'vocabulary.json')) as f:
+            vocabulary = json.load(f)
+
+        params = meta.get('vectorizer_params', {})
+        if 'ngram_range' in params:
+            params['ngram_range'] = tuple(params['ngram_range'])
+        index = cls.from_vocabulary(vocabulary, np.load(os.path.join(path, 'idf.npy')), **params)
+        index.version = meta['version']
+        index.path = path
+        index._map(path)
+        return index
+
+    def _map(self, path: str):
+        n_features = len(self.vectorizer.vocabulary_)
+        indptr = _read(path, 'indptr.bin', np.int64)
+        self.matrix = sp.csr_matrix(
+            (_read(path, 'data.bin', np.float32), _read(path, 'indices.bin', np.int32), indptr),
+            shape=(len(indptr) - 1, n_features),
+            copy=False
+        )
+        self.texts = _read_texts(path)
+
+    def _append_files(self, path: str, rows: sp.csr_matrix, texts: Sequence[str]):
+        nnz = int(self.matrix.indptr[-1])
+        text_end = int(self.texts.offsets[-1])
+        _write(path, 'data.bin', np.asarray(rows.data, dtype=np.float32), append=True)
+        _write(path, 'indices.bin', np.asarray(rows.indices, dtype=np.int32), append=True)
+        _write(path, 'indptr.bin', rows.indptr[1:].astype(np.int64) + nnz, append=True)
+        _write_texts(path, TextStore.from_texts(texts), append_after=text_end)
+        self._write_meta(path)
+
+    def _write_meta(self, path: str):
+        _write_meta(path, {
+            'format': FORMAT_VERSION,
+            'version': self.version,
+            'vectorizer_params': self.vectorizer_params,
+        })
@@ -1,11 +1,49 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Iterator, List, Union
+import asyncio
 
 class LLMInterface(ABC):
     @abstractmethod
     def generate(self, prompt: str, **kwargs) -> str:
         pass
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        # Backends without native streaming yield the whole completion as one chunk.
+        yield self.generate(prompt, **kwargs)
+
+    def generate_batch(self, prompts: List[str], **kwargs) -> List[str]:
+        # Backends with a native batch endpoint should override this.
+        return [self.generate(prompt, **kwargs) for prompt in prompts]
+
     @abstractmethod
     def get_model_info(self) -> Dict[str, Any]:
-        pass
\ No newline at end of file
+        pass
+
+
+class AsyncLLMInterface(ABC):
+    @abstractmethod
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        pass
+
+    async def agenerate_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        yield await self.agenerate(prompt, **kwargs)
+
+    @abstractmethod
+    async def aget_model_info(self) -> Dict[str, Any]:
+        pass
+
+
+async def generate_async(llm: Union[LLMInterface, AsyncLLMInterface], prompt: str, **kwargs) -> str:
+    if isinstance(llm, AsyncLLMInterface):
+        return await llm.agenerate(prompt, **kwargs)
+    # Synchronous backends are run on the loop's default executor.
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: llm.generate(prompt, **kwargs))
+
+
+async def generate_stream_async(llm: Union[LLMInterface, AsyncLLMInterface], prompt: str, **kwargs) -> AsyncIterator[str]:
+    if isinstance(llm, AsyncLLMInterface):
+        async for chunk in llm.agenerate_stream(prompt, **kwargs):
+            yield chunk
+    else:
+        yield await generate_async(llm, prompt, **kwargs)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+from ..utils.batching import MicroBatchQueue
+from .base import LLMInterface
+
+class _PendingRequest(NamedTuple):
+    prompt: str
+    kwargs: Dict[str, Any]
+    future: Future
+
+
+class BatchingLLM(LLMInterface):
+    """Micro-batches ``generate`` calls from many threads in front of a backend.
+
+    Requests are queued until ``max_batch_size`` prompts are waiting or the
+    oldest one has waited ``max_wait`` seconds, then dispatched together. Backends
+    that override ``generate_batch`` receive each batch (grouped by generation
+    options) in one call; otherwise the prompts are sent as concurrent
+    ``generate`` calls. Streaming calls bypass the queue.
+    """
+
+    def __init__(self, backend: LLMInterface, max_batch_size: int = 8, max_wait: float = 0.01,
+                 max_workers: Optional[int] = None):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or max_batch_size * 4,
+                                            thread_name_prefix='kaag-batching')
+        self._native_batch = type(backend).generate_batch is not LLMInterface.generate_batch
+        self._queue: MicroBatchQueue[_PendingRequest] = MicroBatchQueue(
+            self._dispatch, max_batch_size, max_wait, 'BatchingLLM'
+        )
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        return self.submit(prompt, **kwargs).result()
+
+    def submit(self, prompt: str, **kwargs) -> Future:
+        future: Future = Future()
+        self._queue.put(_PendingRequest(prompt, kwargs, future))
+        return future
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        return self.backend.generate_stream(prompt, **kwargs)
+
+    def generate_batch(self, prompts: List[str], **kwargs) -> List[str]:
+        futures = [self.submit(prompt, **kwargs) for prompt in prompts]
+        return [future.result() for future in futures]
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return self.backend.get_model_info()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._queue.stats()
+        return {'requests': stats.pop('items'), **stats}
+
+    def close(self):
+        self._queue.close()
+        self._executor.shutdown(wait=True)
+
+    def _dispatch(self, batch: List[_PendingRequest]):
+        if not self._native_batch:
+            for request in batch:
+                self._executor.submit(self._call_single, request)
+            return
+
+        groups: Dict[str, List[_PendingRequest]] = {}
+        for request in batch:
+            key = json.dumps(request.kwargs, sort_keys=True, default=repr)
+            groups.setdefault(key, []).append(request)
+        for requests in groups.values():
+            self._executor.submit(self._call_batch, requests)
+
+    def _call_single(self, request: _PendingRequest):
+        if not request.future.set_running_or_notify_cancel():
+            return
+        try:
+            request.future.set_result(self.backend.generate(request.prompt, **request.kwargs))
+        except BaseException as e:
+            request.future.set_exception(e)
+
+    def _call_batch(self, requests: List[_PendingRequest]):
+        requests = [request for request in requests if request.future.set_running_or_notify_cancel()]
+        if not requests:
+            return
+        try:
+            responses = self.backend.generate_batch([request.prompt for request in requests], **requests[0].kwargs)
+            if len(responses) != len(requests):
+                raise RuntimeError(f"Backend returned {len(responses)} responses for {len(requests)} prompts")
+        except BaseException as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+        for request, response in zip(requests, responses):
+            request.future.set_result(response)
\ No newline at end of file
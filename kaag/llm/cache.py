@@ -0,0 +1,162 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+from .base import LLMInterface
+
+class CachingLLM(LLMInterface):
+    """Caches generations of a backend keyed by model, options and normalized prompt.
+
+    Lookups go to an in-memory LRU first and then, if ``disk_path`` is set, to a
+    sqlite file shared across processes and restarts. Entries older than ``ttl``
+    seconds are ignored. With ``deterministic_only`` only calls whose temperature
+    is 0 are cached, since sampled outputs are not meant to repeat.
+    """
+
+    def __init__(self, backend: LLMInterface, maxsize: int = 4096, ttl: Optional[float] = None,
+                 disk_path: Optional[str] = None, deterministic_only: bool = False):
+        self.backend = backend
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.deterministic_only = deterministic_only
+        self.model = getattr(backend, 'model', type(backend).__name__)
+        self._memory: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if disk_path is not None:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS generations (key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._disk.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        if not self._is_cacheable(kwargs):
+            self._count('bypassed')
+            return self.backend.generate(prompt, **kwargs)
+
+        key = self.cache_key(prompt, **kwargs)
+        response = self._lookup(key)
+        if response is not None:
+            return response
+
+        response = self.backend.generate(prompt, **kwargs)
+        self._store(key, response)
+        return response
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        if not self._is_cacheable(kwargs):
+            self._count('bypassed')
+            yield from self.backend.generate_stream(prompt, **kwargs)
+            return
+
+        key = self.cache_key(prompt, **kwargs)
+        response = self._lookup(key)
+        if response is not None:
+            yield response
+            return
+
+        chunks = []
+        for chunk in self.backend.generate_stream(prompt, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        self._store(key, ''.join(chunks))
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return self.backend.get_model_info()
+
+    def cache_key(self, prompt: str, **kwargs) -> str:
+        payload = json.dumps(
+            {'model': self.model, 'options': kwargs, 'prompt': _normalize_prompt(prompt)},
+            sort_keys=True, default=repr
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'size': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM generations")
+                self._disk.commit()
+
+    def close(self):
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+    def _is_cacheable(self, kwargs: Dict[str, Any]) -> bool:
+        if not self.deterministic_only:
+            return True
+        options = kwargs.get('options') or {}
+        temperature = options.get('temperature', kwargs.get('temperature'))
+        return temperature == 0
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            if self._disk is not None:
+                row = self._disk.execute("SELECT response, created FROM generations WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def _store(self, key: str, response: str):
+        created = time.time()
+        with self._lock:
+            self._remember(key, response, created)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO generations (key, response, created) VALUES (?, ?, ?)",
+                    (key, response, created)
+                )
+                self._disk.commit()
+
+    def _remember(self, key: str, response: str, created: float):
+        self._memory[key] = (response, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+
+def _normalize_prompt(prompt: str) -> str:
+    # Trailing whitespace and line ending differences do not change the request.
+    return '\n'.join(line.rstrip() for line in prompt.strip().splitlines())
\ No newline at end of file
@@ -1,27 +1,86 @@
+import json
 import requests
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, Dict, Any, Iterator, Optional, Tuple, Union
 from .base import LLMInterface
 
 class OllamaLLM(LLMInterface):
-    def __init__(self, model: str = "llama2", api_url: str = "http://localhost:11434"):
+    def __init__(self, model: str = "llama2", api_url: str = "http://localhost:11434",
+                 pool_size: int = 10, timeout: Union[float, Tuple[float, float], None] = (5.0, 120.0),
+                 max_retries: int = 2, backoff_factor: float = 0.5,
+                 on_prompt: Optional[Callable[[str], None]] = None):
         self.model = model
         self.api_url = api_url
+        self.timeout = timeout
+        # Opt-in hook for inspecting prompts (e.g. logging.debug); nothing is printed by default.
+        self.on_prompt = on_prompt
+        self.session = self._create_session(pool_size, max_retries, backoff_factor)
+
+    def _create_session(self, pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=None,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
 
     def generate(self, prompt: str, **kwargs) -> str:
-        print(prompt)
-        response = requests.post(
+        if self.on_prompt is not None:
+            self.on_prompt(prompt)
+        response = self.session.post(
             f"{self.api_url}/api/generate",
             json={
                 "model": self.model,
                 "prompt": prompt,
                 "stream": False,
                 **kwargs
-            }
+            },
+            timeout=self.timeout
         )
         response.raise_for_status()
         return response.json()['response']
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        if self.on_prompt is not None:
+            self.on_prompt(prompt)
+        with self.session.post(
+            f"{self.api_url}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                **kwargs,
+                "stream": True
+            },
+            timeout=self.timeout,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            # Ollama streams one JSON object per line until a chunk with "done": true.
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if 'error' in chunk:
+                    raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+                if chunk.get('response'):
+                    yield chunk['response']
+                if chunk.get('done'):
+                    break
+
     def get_model_info(self) -> Dict[str, Any]:
-        response = requests.get(f"{self.api_url}/api/show", params={"name": self.model})
+        response = self.session.get(f"{self.api_url}/api/show", params={"name": self.model}, timeout=self.timeout)
         response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        return response.json()
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,96 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from .base import AsyncLLMInterface
+
+class AsyncOllamaLLM(AsyncLLMInterface):
+    """Ollama client for asyncio, backed by a pooled ``aiohttp`` session.
+
+    At most ``max_concurrency`` requests are in flight at once; further callers
+    wait on a semaphore. Requires the optional ``aiohttp`` dependency.
+    """
+
+    def __init__(self, model: str = "llama2", api_url: str = "http://localhost:11434",
+                 max_concurrency: int = 64, pool_size: int = 100, timeout: Optional[float] = 120.0,
+                 on_prompt: Optional[Callable[[str], None]] = None):
+        self.model = model
+        self.api_url = api_url
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.on_prompt = on_prompt
+        self._session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_session(self):
+        # The session and semaphore are bound to the running loop, so create them on first use.
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        if self.on_prompt is not None:
+            self.on_prompt(prompt)
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.post(
+                f"{self.api_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    **kwargs
+                }
+            ) as response:
+                response.raise_for_status()
+                return (await response.json())['response']
+
+    async def agenerate_stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        if self.on_prompt is not None:
+            self.on_prompt(prompt)
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.post(
+                f"{self.api_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    **kwargs,
+                    "stream": True
+                }
+            ) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if 'error' in chunk:
+                        raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+                    if chunk.get('response'):
+                        yield chunk['response']
+                    if chunk.get('done'):
+                        break
+
+    async def aget_model_info(self) -> Dict[str, Any]:
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.get(f"{self.api_url}/api/show", params={"name": self.model}) as response:
+                response.raise_for_status()
+                return await response.json()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> 'AsyncOllamaLLM':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
\ No newline at end of file
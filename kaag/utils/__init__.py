@@ -1,3 +1,27 @@
-from .config import load_config
+from typing import TYPE_CHECKING
+from .lazy import lazy_exports
 
-__all__ = ['load_config']
\ No newline at end of file
+if TYPE_CHECKING:
+    from .batching import MicroBatchQueue
+    from .config import load_config
+    from .expression import CompiledExpression, compile_expression
+    from .tokens import TokenCounter, estimate_tokens
+
+__all__ = [
+    'MicroBatchQueue',
+    'load_config',
+    'CompiledExpression',
+    'compile_expression',
+    'lazy_exports',
+    'TokenCounter',
+    'estimate_tokens',
+]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'MicroBatchQueue': '.batching',
+    'load_config': '.config',
+    'CompiledExpression': '.expression',
+    'compile_expression': '.expression',
+    'TokenCounter': '.tokens',
+    'estimate_tokens': '.tokens',
+})
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+class MicroBatchQueue(Generic[T]):
+    """Collects items from many threads and hands them to ``flush`` in batches.
+
+    A batch is flushed when ``max_batch_size`` items are waiting or the oldest
+    one has waited ``max_wait`` seconds. ``flush`` runs on a daemon dispatcher
+    thread, started on first use, and must not raise.
+    """
+
+    def __init__(self, flush: Callable[[List[T]], None], max_batch_size: int, max_wait: float, name: str):
+        self.flush = flush
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: Deque[Tuple[T, float]] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._dispatcher: Optional[threading.Thread] = None
+
+        self._items = 0
+        self._batches = 0
+        self._max_queue_depth = 0
+        self._total_wait = 0.0
+        self._max_observed_wait = 0.0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, item: T):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._run, name=f'kaag-{self.name}', daemon=True)
+                self._dispatcher.start()
+            self._queue.append((item, time.monotonic()))
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            self._condition.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'items': self._items,
+                'batches': self._batches,
+                'mean_batch_size': self._items / self._batches if self._batches else 0.0,
+                'queue_depth': len(self._queue),
+                'max_queue_depth': self._max_queue_depth,
+                'mean_wait': self._total_wait / self._items if self._items else 0.0,
+                'max_wait': self._max_observed_wait,
+            }
+
+    def close(self):
+        """Flush what is queued, then stop the dispatcher."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                # Hold the batch open until it is full or its oldest item has waited max_wait.
+                deadline = self._queue[0][1] + self.max_wait
+                while len(self._queue) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                entries = [self._queue.popleft() for _ in range(min(self.max_batch_size, len(self._queue)))]
+                now = time.monotonic()
+                self._items += len(entries)
+                self._batches += 1
+                for _, enqueued_at in entries:
+                    wait = now - enqueued_at
+                    self._total_wait += wait
+                    self._max_observed_wait = max(self._max_observed_wait, wait)
+
+            self.flush([item for item, _ in entries])
@@ -0,0 +1,221 @@
+import ast
+import math
+import operator
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+LinearForm = Tuple[Dict[str, float], float]
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: math.pow,
+}
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+_FUNCTIONS = {'abs': abs, 'min': min, 'max': max}
+# Exponents must be numeric literals up to this size and powers cannot be nested,
+# so an expression such as 9 ** 9 ** 9 cannot tie up the process computing a huge number.
+_MAX_EXPONENT = 16
+_MISSING = object()
+
+
+class CompiledExpression:
+    """A validated utility expression such as ``lambda state: state['trust'] * 0.5``.
+
+    ``linear`` holds ``(coefficients, intercept)`` when the expression is an affine
+    function of the metrics, so it can be evaluated as a dot product against a
+    metric vector; otherwise it is ``None``.
+    """
+    __slots__ = ('source', 'metrics', 'linear', '_function')
+
+    def __init__(self, source: str, metrics: FrozenSet[str], linear: Optional[LinearForm],
+                 function: Callable[[Dict[str, Any]], float]):
+        self.source = source
+        self.metrics = metrics
+        self.linear = linear
+        self._function = function
+
+    def __call__(self, state: Dict[str, Any]) -> float:
+        return self._function(state)
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str) -> CompiledExpression:
+    """Compile a utility expression over ``state[...]`` lookups.
+
+    Accepts either ``lambda state: <expr>`` or a bare ``<expr>`` using ``state``.
+    Only numeric constants, ``state['metric']`` lookups, arithmetic operators and
+    ``abs``/``min``/``max`` are allowed, and ``**`` only unnested and with a literal
+    exponent of at most 16 in magnitude; anything else, or constant arithmetic that
+    fails or overflows, raises ``ValueError``. Powers are computed in floating
+    point and saturate to infinity instead of raising ``OverflowError``.
+    Results are cached by source text and shared between callers.
+    """
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid utility expression {source!r}: {e.msg}") from e
+
+    body = tree.body
+    param = 'state'
+    if isinstance(body, ast.Lambda):
+        args = body.args
+        if (len(args.args) != 1 or args.vararg or args.kwarg or args.kwonlyargs
+                or args.defaults or getattr(args, 'posonlyargs', [])):
+            raise ValueError(f"Utility lambda must take exactly one argument: {source!r}")
+        param = args.args[0].arg
+        body = body.body
+
+    metrics = set()
+    linear = _Validator(source, param, metrics).visit(body)
+    if linear is not None and not all(map(math.isfinite, [linear[1], *linear[0].values()])):
+        raise ValueError(f"Constant out of range in utility expression {source!r}")
+
+    body = _FloatPowers().visit(body)
+    function_tree = ast.Expression(body=ast.Lambda(
+        args=ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg=param)], vararg=None,
+            kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]
+        ),
+        body=body
+    ))
+    ast.fix_missing_locations(function_tree)
+    function = eval(compile(function_tree, '<utility>', 'eval'), {'__builtins__': {}, '_power': _power, **_FUNCTIONS})
+
+    return CompiledExpression(source, frozenset(metrics), linear, function)
+
+
+class _Validator:
+    # Walks the expression, rejecting unsupported syntax and returning its linear
+    # form (or None when it is not affine in the metrics).
+
+    def __init__(self, source: str, param: str, metrics: set):
+        self.source = source
+        self.param = param
+        self.metrics = metrics
+
+    def fail(self, node: ast.AST):
+        raise ValueError(f"Unsupported syntax {type(node).__name__} in utility expression {self.source!r}")
+
+    def visit(self, node: ast.AST) -> Optional[LinearForm]:
+        value = _constant(node)
+        if value is not _MISSING:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                self.fail(node)
+            return {}, float(value)
+
+        if isinstance(node, ast.Subscript):
+            key = node.slice.value if isinstance(node.slice, getattr(ast, 'Index', ())) else node.slice
+            metric = _constant(key)
+            if not (isinstance(node.value, ast.Name) and node.value.id == self.param and isinstance(metric, str)):
+                self.fail(node)
+            self.metrics.add(metric)
+            return {metric: 1.0}, 0.0
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, _UNARY_OPERATORS):
+            operand = self.visit(node.operand)
+            if operand is None or isinstance(node.op, ast.UAdd):
+                return operand
+            return _scale(operand, -1.0)
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            if isinstance(node.op, ast.Pow):
+                exponent = node.right
+                if isinstance(exponent, ast.UnaryOp) and isinstance(exponent.op, _UNARY_OPERATORS):
+                    exponent = exponent.operand
+                value = _constant(exponent)
+                if (isinstance(value, bool) or not isinstance(value, (int, float))
+                        or not abs(value) <= _MAX_EXPONENT):
+                    raise ValueError(
+                        f"Exponents must be numeric literals of at most {_MAX_EXPONENT} "
+                        f"in utility expression {self.source!r}"
+                    )
+                if any(isinstance(inner, ast.BinOp) and isinstance(inner.op, ast.Pow) for inner in ast.walk(node.left)):
+                    raise ValueError(f"Nested powers are not supported in utility expression {self.source!r}")
+            left, right = self.visit(node.left), self.visit(node.right)
+            if left is None or right is None:
+                return None
+            if isinstance(node.op, ast.Add):
+                return _add(left, right, 1.0)
+            if isinstance(node.op, ast.Sub):
+                return _add(left, right, -1.0)
+            if isinstance(node.op, ast.Mult):
+                if not left[0]:
+                    return _scale(right, left[1])
+                if not right[0]:
+                    return _scale(left, right[1])
+            if isinstance(node.op, ast.Div) and not right[0] and right[1] != 0:
+                return _scale(left, 1.0 / right[1])
+            if not left[0] and not right[0]:
+                try:
+                    value = float(_BINARY_OPERATORS[type(node.op)](left[1], right[1]))
+                except (ArithmeticError, TypeError, ValueError) as e:
+                    raise ValueError(f"Invalid constant arithmetic in utility expression {self.source!r}: {e}") from e
+                if not math.isfinite(value):
+                    raise ValueError(f"Constant out of range in utility expression {self.source!r}")
+                return {}, value
+            return None
+
+        if isinstance(node, ast.Call):
+            if (not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS
+                    or node.keywords or not node.args):
+                self.fail(node)
+            for arg in node.args:
+                self.visit(arg)
+            return None
+
+        self.fail(node)
+
+
+class _FloatPowers(ast.NodeTransformer):
+    # Rewrites ``a ** b`` as ``_power(a, b)``.
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        if not isinstance(node.op, ast.Pow):
+            return node
+        call = ast.Call(func=ast.Name(id='_power', ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return ast.copy_location(call, node)
+
+
+def _power(base: float, exponent: float) -> float:
+    # Powers are computed in floating point; results too large for a float become +/-inf
+    # instead of raising OverflowError in the middle of routing.
+    try:
+        return math.pow(base, exponent)
+    except OverflowError:
+        odd = float(exponent).is_integer() and int(exponent) % 2 == 1
+        return -math.inf if base < 0 and odd else math.inf
+
+
+def _constant(node: ast.AST) -> Any:
+    # The literal value of a constant node, or _MISSING.
+    if isinstance(node, ast.Constant):
+        return node.value
+    # Python 3.7 parses literals as Num and Str nodes.
+    if sys.version_info < (3, 8):
+        if isinstance(node, ast.Num):
+            return node.n
+        if isinstance(node, ast.Str):
+            return node.s
+    return _MISSING
+
+
+def _scale(form: LinearForm, factor: float) -> LinearForm:
+    coefficients, intercept = form
+    return {metric: value * factor for metric, value in coefficients.items()}, intercept * factor
+
+
+def _add(left: LinearForm, right: LinearForm, sign: float) -> LinearForm:
+    coefficients = dict(left[0])
+    for metric, value in right[0].items():
+        coefficients[metric] = coefficients.get(metric, 0.0) + sign * value
+    return coefficients, left[1] + sign * right[1]
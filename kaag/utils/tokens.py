@@ -0,0 +1,7 @@
+from typing import Callable
+
+TokenCounter = Callable[[str], int]
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English with BPE tokenizers; cheap and model independent.
+    return (len(text) + 3) // 4
\ No newline at end of file
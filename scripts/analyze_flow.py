@@ -0,0 +1,40 @@
+import argparse
+import sys
+
+from kaag.core.graph import ConversationGraph
+from kaag.utils.config import load_config
+
+def main(config_path: str, show_leaves: bool) -> int:
+    graph = ConversationGraph(load_config(config_path))
+    analysis = graph.analyze()
+
+    print(f"{len(analysis.regions)} stages, {len(analysis.reachable)} reachable from '{graph.initial_node}'")
+    problems = [
+        ("Infeasible transitions (bounds cannot be met within the metric ranges)",
+         [f"{parent} -> {child}" for parent, child in analysis.infeasible_edges]),
+        ("Unreachable stages", list(analysis.unreachable)),
+        ("Stages that can never be left", list(analysis.stuck)),
+        ("Stages that never lead to a leaf", list(analysis.no_leaf)),
+    ]
+    for title, items in problems:
+        if items:
+            print(f"\n{title}:")
+            for item in items:
+                print(f"  {item}")
+
+    if show_leaves:
+        print("\nReachable leaves:")
+        for stage, leaves in analysis.reachable_leaves.items():
+            print(f"  {stage}: {', '.join(sorted(leaves)) or '-'}")
+
+    if analysis.ok:
+        print("\nNo problems found.")
+    return 0 if analysis.ok else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check a KAAG config for dead stages and unreachable transitions")
+    parser.add_argument("config", help="Path to the YAML config")
+    parser.add_argument("--leaves", action="store_true", help="List the leaves reachable from every stage")
+    args = parser.parse_args()
+
+    sys.exit(main(args.config, args.leaves))
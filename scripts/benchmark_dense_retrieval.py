@@ -0,0 +1,60 @@
+import argparse
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from kaag.knowledge_retriever.dense import DenseIndex
+
+def synthetic_corpus(num_docs: int, dim: int, num_topics: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    # Clustered embeddings, roughly like sentence embeddings of a topical corpus.
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(num_topics, dim)).astype(np.float32)
+    docs = topics[rng.integers(num_topics, size=num_docs)] + 0.6 * rng.normal(size=(num_docs, dim)).astype(np.float32)
+    query_sources = docs[rng.integers(num_docs, size=200)]
+    queries = query_sources + 0.4 * rng.normal(size=query_sources.shape).astype(np.float32)
+    return docs, queries
+
+def exact_neighbours(docs: np.ndarray, queries: np.ndarray, top_k: int) -> List[set]:
+    docs = docs / np.linalg.norm(docs, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ docs.T
+    return [set(np.argpartition(-row, top_k - 1)[:top_k]) for row in scores]
+
+def measure(index: DenseIndex, queries: np.ndarray, truth: List[set], top_k: int, nprobe: int) -> Tuple[float, float]:
+    start = time.perf_counter()
+    results = index.search_batch(queries, top_k, nprobe=nprobe)
+    latency = (time.perf_counter() - start) / len(queries)
+    recall = np.mean([len({i for i, _ in found} & expected) / top_k for found, expected in zip(results, truth)])
+    return recall, latency
+
+def main(num_docs: int, dim: int, nlist: int, top_k: int):
+    docs, queries = synthetic_corpus(num_docs, dim, num_topics=max(nlist // 2, 1))
+    texts = [f'doc {i}' for i in range(num_docs)]
+    truth = exact_neighbours(docs, queries, top_k)
+
+    print(f"{num_docs} docs, dim {dim}, nlist {nlist}, recall@{top_k} against exact float32 search")
+    print(f"{'dtype':>8} {'nprobe':>7} {'recall':>8} {'ms/query':>9}")
+    for dtype in ('float16', 'int8'):
+        start = time.perf_counter()
+        index = DenseIndex.build(docs, texts, nlist=nlist, dtype=dtype)
+        build_time = time.perf_counter() - start
+
+        recall, latency = measure(index, queries, truth, top_k, nprobe=nlist)
+        print(f"{dtype:>8} {'all':>7} {recall:>8.3f} {latency * 1000:>9.2f}")
+        for nprobe in (1, 2, 4, 8, 16, 32):
+            if nprobe >= nlist:
+                break
+            recall, latency = measure(index, queries, truth, top_k, nprobe)
+            print(f"{dtype:>8} {nprobe:>7} {recall:>8.3f} {latency * 1000:>9.2f}")
+        print(f"{dtype:>8} build {build_time:.1f}s, {index.vectors.nbytes / 2 ** 20:.1f} MiB of vectors")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall vs latency of the IVF dense index against brute force")
+    parser.add_argument("--docs", type=int, default=100000, help="Number of synthetic documents")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--nlist", type=int, default=256, help="Number of IVF clusters")
+    parser.add_argument("--top-k", type=int, default=10, help="Neighbours per query")
+    args = parser.parse_args()
+
+    main(args.docs, args.dim, args.nlist, args.top_k)
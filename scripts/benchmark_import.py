@@ -0,0 +1,77 @@
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+MARKER = '-- kaag import --'
+
+class Target(NamedTuple):
+    statement: str
+    # Cold import budget in milliseconds and heavy modules the statement must not load.
+    max_ms: float
+    forbidden: Tuple[str, ...]
+
+TARGETS = [
+    Target("from kaag.core import NoRAG", 400, ('numpy', 'scipy', 'sklearn', 'networkx')),
+    Target("from kaag.core import RAG", 400, ('numpy', 'scipy', 'sklearn', 'networkx')),
+    Target("from kaag.core import KAAG", 600, ('scipy', 'sklearn', 'networkx')),
+    Target("from kaag.knowledge_retriever import DenseKnowledgeRetriever", 600, ('scipy', 'sklearn')),
+    Target("from kaag.knowledge_retriever import TextFileKnowledgeRetriever", 1500, ('sklearn',)),
+]
+
+def measure(statement: str) -> Tuple[float, Dict[str, int]]:
+    """Import ``statement`` in a fresh interpreter; return its cumulative time (ms) and per-module times (us)."""
+    code = f"import sys; print({MARKER!r}, file=sys.stderr, flush=True); {statement}"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"`{statement}` failed:\n{result.stderr}")
+
+    lines = result.stderr.split(MARKER, 1)[1].splitlines()
+    total_us = 0
+    modules: Dict[str, int] = {}
+    for line in lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        _, cumulative_us, name = line.split('|', 2)
+        cumulative = int(cumulative_us)
+        modules[name.strip()] = cumulative
+        # Top-level imports of the statement are not indented; their cumulative times add up to the total.
+        if not name[1:].startswith(' '):
+            total_us += cumulative
+    return total_us / 1000, modules
+
+def main(repeat: int, scale: float, targets: Sequence[Target], show_top: int) -> int:
+    failures: List[str] = []
+    for target in targets:
+        runs = [measure(target.statement) for _ in range(repeat)]
+        total = statistics.median(run[0] for run in runs)
+        modules = runs[-1][1]
+        budget = target.max_ms * scale
+        loaded = [name for name in target.forbidden if name in modules]
+
+        status = 'ok' if total <= budget and not loaded else 'FAIL'
+        print(f"{status:4}  {total:8.1f} ms  (budget {budget:.0f} ms)  {target.statement}")
+        if show_top:
+            for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:show_top]:
+                print(f"        {cumulative / 1000:8.1f} ms  {name}")
+        if total > budget:
+            failures.append(f"`{target.statement}` took {total:.1f} ms, over its {budget:.0f} ms budget")
+        if loaded:
+            failures.append(f"`{target.statement}` imported {', '.join(loaded)}")
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold import times of KAAG entry points with -X importtime")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per statement; the median is reported")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. on slow CI machines")
+    parser.add_argument("--top", type=int, default=0, help="Show the N slowest modules of each statement")
+    parser.add_argument("--only", help="Only measure statements containing this text")
+    args = parser.parse_args()
+
+    selected = [target for target in TARGETS if args.only is None or args.only in target.statement]
+    sys.exit(main(args.repeat, args.scale, selected, args.top))
@@ -0,0 +1,53 @@
+import argparse
+import random
+import time
+import numpy as np
+
+from kaag.core.graph import ConversationGraph
+from kaag.gim.policies import create_policy
+from scripts.benchmark_turns import synthetic_config
+
+POLICY_CONFIGS = [
+    {'type': 'greedy'},
+    {'type': 'softmax', 'temperature': 0.5, 'exploration_rate': 0.1},
+    {'type': 'epsilon_greedy', 'epsilon': 0.1},
+    {'type': 'ucb', 'c': 1.0},
+]
+
+def benchmark_select(policy_config, num_transitions: int, calls: int) -> float:
+    policy = create_policy(policy_config)
+    rng = random.Random(0)
+    children = [f'stage_{i}' for i in range(num_transitions)]
+    utilities = [float(i * 37 % 101) for i in range(num_transitions)]
+    start = time.perf_counter()
+    for _ in range(calls):
+        policy.select('start', children, utilities, rng)
+    return (time.perf_counter() - start) / calls
+
+def benchmark_batch(policy_config, graph: ConversationGraph, sessions: int) -> float:
+    graph.gim.policy = create_policy(policy_config)
+    compiled = graph.dbn.compiled
+    rng = np.random.default_rng(0)
+    nodes = rng.integers(len(compiled.nodes), size=sessions)
+    vectors = rng.uniform(0, 100, size=(sessions, len(compiled.metrics)))
+    start = time.perf_counter()
+    graph.gim.select_next_nodes(nodes, vectors, rng=rng)
+    return (time.perf_counter() - start) / sessions
+
+def main(calls: int, sessions: int):
+    # The synthetic flow has utilities up to ~300, where exp(u / 0.5) overflows.
+    graph = ConversationGraph(synthetic_config(200))
+    print(f"{'policy':>16} {'us/select (3)':>14} {'us/select (20)':>15} {'ns/session batch':>17}")
+    for policy_config in POLICY_CONFIGS:
+        small = benchmark_select(policy_config, 3, calls) * 1e6
+        large = benchmark_select(policy_config, 20, calls) * 1e6
+        batch = benchmark_batch(policy_config, graph, sessions) * 1e9
+        print(f"{policy_config['type']:>16} {small:>14.2f} {large:>15.2f} {batch:>17.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark GIM selection policies")
+    parser.add_argument("--calls", type=int, default=100000, help="Single-session selections per policy")
+    parser.add_argument("--sessions", type=int, default=1000000, help="Sessions per batch selection")
+    args = parser.parse_args()
+
+    main(args.calls, args.sessions)
@@ -0,0 +1,88 @@
+import argparse
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from jinja2 import Environment, FileSystemLoader
+
+from kaag.core.graph import ConversationGraph
+from kaag.core.kaag import KAAG
+from kaag.llm.base import LLMInterface
+
+METRICS = ['trust', 'interest', 'comprehension', 'budget_alignment', 'frustration', 'technical_fit']
+
+class EchoLLM(LLMInterface):
+    def generate(self, prompt: str, **kwargs) -> str:
+        return "Thank you, please continue."
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return {'model': 'echo'}
+
+def synthetic_config(num_stages: int, branching: int = 3, num_examples: int = 5, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    stages: List[Dict[str, Any]] = []
+    for i in range(num_stages):
+        stage = {
+            'id': f'stage_{i}',
+            'instructions': f'Instructions for stage {i}. ' * 5,
+            'examples': [
+                {'user': f'User example {j} for stage {i}', 'AI': f'AI example {j} for stage {i}'}
+                for j in range(num_examples)
+            ],
+        }
+        if i >= num_stages - 2:
+            stage['is_leaf'] = True
+        else:
+            stage['transitions'] = []
+            for _ in range(branching):
+                target = rng.randrange(i + 1, num_stages)
+                metric = rng.choice(METRICS)
+                weights = ' + '.join(f"state['{m}'] * {rng.random():.2f}" for m in rng.sample(METRICS, 3))
+                stage['transitions'].append({
+                    'to': f'stage_{target}',
+                    'conditions': {metric: [0, 100]},
+                    'utility': {'function': f'lambda state: {weights}'},
+                })
+        stages.append(stage)
+
+    return {
+        'persona': {'identity': 'Benchmark persona', 'traits': ['Patient', 'Curious']},
+        'metrics': {metric: {'initial': 50} for metric in METRICS},
+        'analyzers': [],
+        'stages': stages,
+        'initial_node': 'stage_0',
+    }
+
+def benchmark(num_stages: int, turns: int, template) -> float:
+    config = synthetic_config(num_stages)
+    graph = ConversationGraph(config)
+    llm = EchoLLM()
+
+    elapsed = 0.0
+    completed = 0
+    while completed < turns:
+        kaag = KAAG(llm, config, template, graph=graph)
+        while completed < turns and not graph.dbn.is_leaf_node(kaag.current_node):
+            start = time.perf_counter()
+            kaag.process_turn("Tell me more about the product.")
+            elapsed += time.perf_counter() - start
+            completed += 1
+    return elapsed / turns
+
+def main(stage_counts: List[int], turns: int):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    template_dir = os.path.join(os.path.dirname(script_dir), 'evaluation_data', 'prompt_templates')
+    template = Environment(loader=FileSystemLoader(template_dir)).get_template('kaag.jinja')
+
+    print(f"{'stages':>8} {'us/turn':>10}")
+    for num_stages in stage_counts:
+        print(f"{num_stages:>8} {benchmark(num_stages, turns, template) * 1e6:>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure KAAG per-turn overhead (excluding the LLM) for growing configs")
+    parser.add_argument("--stages", type=int, nargs='+', default=[9, 100, 300, 1000], help="Config sizes to benchmark")
+    parser.add_argument("--turns", type=int, default=2000, help="Turns to time per config size")
+    args = parser.parse_args()
+
+    main(args.stages, args.turns)
@@ -9,6 +9,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sentence_transformers import SentenceTransformer
 
 from kaag.core.kaag import KAAG
+from kaag.core.graph import ConversationGraph
 from kaag.core.rag import RAG
 from kaag.core.norag import NoRAG
 from kaag.llm.ollama import OllamaLLM
@@ -150,6 +151,8 @@ def main(num_runs):
     print("Loading configuration...")
     config = load_config(config_path)
 
+    graph = ConversationGraph(config)
+
     print("Loading test cases...")
     test_cases = load_test_cases(test_cases_path)
 
@@ -180,7 +183,7 @@ def main(num_runs):
         
         for scenario in test_cases['test_scenarios']:
             print("Initializing KAAG, RAG, and NoRAG...")
-            kaag = KAAG(llm, config, kaag_template)
+            kaag = KAAG(llm, config, kaag_template, graph=graph)
             rag = RAG(llm, config, knowledge_retriever, rag_template)
             norag = NoRAG(llm, config, norag_template)
             print(f"Evaluating scenario: {scenario['name']}")
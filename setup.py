@@ -12,12 +12,14 @@ setup(
         "requests",
         "numpy",
         "scikit-learn",
+        "scipy",
         "spacy",
         "textblob",
         "sentence-transformers",
     ],
     extras_require={
         "dev": ["pytest", "black", "flake8"],
+        "async": ["aiohttp"],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from typing import List
+
+from kaag.analyzers import BatchedAnalyzer
+
+
+class SlowLengthAnalyzer(BatchedAnalyzer):
+    writes = ('length',)
+    max_wait = 0.001
+    calls: List[List[str]] = []
+    release = threading.Event()
+
+    @classmethod
+    def load_model(cls, **params):
+        return params.get('scale', 1)
+
+    @classmethod
+    def predict_batch(cls, model, messages):
+        cls.calls.append(list(messages))
+        cls.release.wait(5)
+        return [{'length': len(message) * model} for message in messages]
+
+
+def setup_function():
+    SlowLengthAnalyzer.calls.clear()
+    SlowLengthAnalyzer.release.clear()
+
+
+def teardown_function():
+    SlowLengthAnalyzer.release.set()
+    BatchedAnalyzer.close_shared()
+
+
+def test_sessions_share_one_batcher_and_cache_results():
+    SlowLengthAnalyzer.release.set()
+    first, second = SlowLengthAnalyzer(scale=2), SlowLengthAnalyzer(scale=2)
+    assert first.batcher is second.batcher
+    assert SlowLengthAnalyzer(scale=3).batcher is not first.batcher
+
+    assert first.analyze({'last_message': 'hello'}) == {'length': 10}
+    assert second.analyze({'last_message': 'hello'}) == {'length': 10}
+    assert first.analyze({'last_message': ''}) == {}
+    assert SlowLengthAnalyzer.calls == [['hello']]
+    assert first.batcher.stats()['cache_hits'] == 1
+
+
+def test_cancelled_waiter_does_not_affect_other_waiters():
+    async def run():
+        analyzers = [SlowLengthAnalyzer(), SlowLengthAnalyzer()]
+        state = {'last_message': 'shared message'}
+        timed_out = asyncio.ensure_future(asyncio.wait_for(analyzers[0].aanalyze(state), 0.01))
+        waiting = asyncio.ensure_future(analyzers[1].aanalyze(state))
+        try:
+            await timed_out
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected the first wait to time out")
+        SlowLengthAnalyzer.release.set()
+        assert await waiting == {'length': 14}
+        # The dispatcher is still alive and serves new messages.
+        assert await asyncio.wait_for(analyzers[0].aanalyze({'last_message': 'next'}), 5) == {'length': 4}
+
+    asyncio.run(run())
+
+
+def test_model_errors_reach_every_caller():
+    class Failing(SlowLengthAnalyzer):
+        @classmethod
+        def predict_batch(cls, model, messages):
+            raise ValueError("model failed")
+
+    analyzer = Failing()
+    for _ in range(2):
+        try:
+            analyzer.analyze({'last_message': 'boom'})
+        except ValueError as e:
+            assert str(e) == "model failed"
+        else:
+            raise AssertionError("expected the model error")
+
+
+def test_close_shared_from_subclass_removes_its_batchers():
+    SlowLengthAnalyzer.release.set()
+    batcher = SlowLengthAnalyzer().batcher
+    SlowLengthAnalyzer.close_shared()
+    assert '_shared' not in SlowLengthAnalyzer.__dict__
+    assert all(key[0] is not SlowLengthAnalyzer for key in BatchedAnalyzer._shared)
+    assert SlowLengthAnalyzer().batcher is not batcher
@@ -0,0 +1,109 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from kaag.llm.base import LLMInterface
+from kaag.llm.batching import BatchingLLM
+
+
+class FakeBatchBackend(LLMInterface):
+    """Records every native batch call and fails prompts containing 'boom'."""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, **kwargs):
+        raise AssertionError("batches should use generate_batch")
+
+    def generate_batch(self, prompts, **kwargs):
+        with self.lock:
+            self.batches.append((list(prompts), kwargs))
+        if any('boom' in prompt for prompt in prompts):
+            raise RuntimeError("backend failed")
+        return [f"{prompt}|{kwargs.get('temperature')}" for prompt in prompts]
+
+    def get_model_info(self):
+        return {'name': 'fake'}
+
+
+class FakeSingleBackend(LLMInterface):
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, **kwargs):
+        with self.lock:
+            self.calls += 1
+        if prompt == 'boom':
+            raise ValueError("bad prompt")
+        return prompt.upper()
+
+    def get_model_info(self):
+        return {'name': 'single'}
+
+
+def test_concurrent_requests_are_grouped_by_options():
+    backend = FakeBatchBackend()
+    llm = BatchingLLM(backend, max_batch_size=8, max_wait=0.2)
+    try:
+        futures = [llm.submit(f'p{i}', temperature=i % 2) for i in range(8)]
+        results = [future.result(5) for future in futures]
+    finally:
+        llm.close()
+
+    assert results == [f'p{i}|{i % 2}' for i in range(8)]
+    # One full batch, split into one backend call per distinct set of options.
+    assert sorted((sorted(prompts), kwargs['temperature']) for prompts, kwargs in backend.batches) == [
+        (['p0', 'p2', 'p4', 'p6'], 0),
+        (['p1', 'p3', 'p5', 'p7'], 1),
+    ]
+    stats = llm.stats()
+    assert stats['requests'] == 8 and stats['batches'] == 1 and stats['queue_depth'] == 0
+
+
+def test_partial_batches_flush_after_max_wait():
+    backend = FakeBatchBackend()
+    llm = BatchingLLM(backend, max_batch_size=64, max_wait=0.01)
+    try:
+        assert llm.generate('alone', temperature=0) == 'alone|0'
+    finally:
+        llm.close()
+    assert backend.batches == [(['alone'], {'temperature': 0})]
+
+
+def test_batch_failure_reaches_every_request_in_the_group():
+    backend = FakeBatchBackend()
+    llm = BatchingLLM(backend, max_batch_size=3, max_wait=0.2)
+    try:
+        futures = [llm.submit(prompt) for prompt in ('a', 'boom', 'c')]
+        for future in futures:
+            with pytest.raises(RuntimeError, match='backend failed'):
+                future.result(5)
+        # The dispatcher survives the failure.
+        assert llm.generate('after') == 'after|None'
+    finally:
+        llm.close()
+
+
+def test_backends_without_batching_get_concurrent_single_calls():
+    backend = FakeSingleBackend()
+    llm = BatchingLLM(backend, max_batch_size=4, max_wait=0.01)
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(llm.generate, ['a', 'b', 'c', 'd']))
+        assert results == ['A', 'B', 'C', 'D']
+        with pytest.raises(ValueError, match='bad prompt'):
+            llm.generate('boom')
+        assert backend.calls == 5
+        assert llm.get_model_info() == {'name': 'single'}
+    finally:
+        llm.close()
+
+
+def test_closed_llm_rejects_requests():
+    llm = BatchingLLM(FakeSingleBackend())
+    llm.close()
+    with pytest.raises(RuntimeError, match='closed'):
+        llm.generate('late')
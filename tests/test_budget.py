@@ -0,0 +1,37 @@
+from kaag.core.budget import PromptBudget
+
+
+def render(kept):
+    return 'fixed ' + ' '.join(kept['examples']) + ' ' + ' '.join(kept['history'])
+
+
+def test_without_budget_renders_once_and_counts_nothing():
+    counted = []
+    budget = PromptBudget(token_counter=lambda text: counted.append(text) or len(text))
+    prompt, report = budget.assemble(render, {'examples': ['a' * 40], 'history': ['b' * 40]})
+    assert report is None
+    assert counted == []
+    assert prompt == render({'examples': ['a' * 40], 'history': ['b' * 40]})
+
+
+def test_trims_examples_before_history():
+    budget = PromptBudget(max_tokens=20, token_counter=len, trim_order=('examples', 'history'))
+    sections = {'examples': ['e' * 10, 'f' * 10], 'history': ['h' * 5]}
+    prompt, report = budget.assemble(render, sections)
+    assert report.dropped == {'examples': 2, 'history': 0}
+    assert report.total == len(prompt) <= 20
+
+
+def test_known_costs_are_used_and_cached():
+    counted = []
+    budget = PromptBudget(max_tokens=1000, token_counter=lambda text: counted.append(text) or len(text))
+    examples = ('one', 'three')
+    assert budget.item_costs(examples) == [3, 5]
+    assert budget.item_costs(examples) == [3, 5]
+    assert counted == ['one', 'three']
+
+    counted.clear()
+    _, report = budget.assemble(render, {'examples': list(examples), 'history': []},
+                                costs={'examples': budget.item_costs(examples)})
+    assert report.sections == {'examples': 8, 'history': 0}
+    assert counted == [render({'examples': list(examples), 'history': []})]
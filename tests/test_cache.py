@@ -0,0 +1,27 @@
+from typing import List, Sequence
+from kaag.knowledge_retriever.base import BaseKnowledgeRetriever
+from kaag.knowledge_retriever.cache import CachedKnowledgeRetriever
+
+
+class RecordingRetriever(BaseKnowledgeRetriever):
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    def retrieve(self, query: str) -> str:
+        return self.retrieve_batch([query])[0]
+
+    def retrieve_batch(self, queries: Sequence[str]) -> List[str]:
+        self.calls.append(list(queries))
+        return [f'result for {query}' for query in queries]
+
+
+def test_original_query_text_is_retrieved():
+    retriever = RecordingRetriever()
+    cached = CachedKnowledgeRetriever(retriever)
+    results = cached.retrieve_batch(['  Paris  Hotels', 'paris hotels', 'Rome'])
+    assert results == ['result for   Paris  Hotels', 'result for   Paris  Hotels', 'result for Rome']
+    assert retriever.calls == [['  Paris  Hotels', 'Rome']]
+
+    assert cached.retrieve('PARIS hotels') == 'result for   Paris  Hotels'
+    assert retriever.calls == [['  Paris  Hotels', 'Rome']]
+    assert cached.stats()['hits'] == 1
@@ -0,0 +1,34 @@
+from kaag.dbn.dbn import DynamicBayesianNetwork
+from kaag.utils.expression import compile_expression
+
+
+def build(utility):
+    dbn = DynamicBayesianNetwork()
+    for node in ('start', 'a', 'b'):
+        dbn.add_node(node, is_leaf=node != 'start')
+    dbn.add_edge('start', 'a', lambda state: True, utility, bounds={})
+    dbn.add_edge('start', 'b', lambda state: True, compile_expression("state['trust'] * 0.5"), bounds={})
+    return dbn
+
+
+def test_piecewise_callable_is_not_compiled_as_linear():
+    def piecewise(state):
+        return state['trust'] if state['trust'] < 60 else -1000
+
+    dbn = build(piecewise)
+    state = {'trust': 80.0}
+    expected = dbn.evaluate_transitions('start', state)
+    dbn.compile(['trust'])
+    assert dbn.evaluate_transitions('start', state) == expected == (['a', 'b'], [-1000, 40.0])
+
+
+def test_declared_linear_form_is_compiled():
+    def utility(state):
+        return 2 * state['trust'] + 1
+    utility.linear = ({'trust': 2.0}, 1.0)
+
+    dbn = build(utility)
+    compiled = dbn.compile()
+    assert compiled.metrics == ['trust']
+    assert not compiled.fallback_utilities
+    assert dbn.evaluate_transitions('start', {'trust': 10.0}) == (['a', 'b'], [21.0, 5.0])
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from kaag.knowledge_retriever.dense import DenseIndex
+
+
+@pytest.mark.parametrize('dtype', ['float16', 'int8'])
+def test_block_scoring_matches_scoring_everything(dtype):
+    rng = np.random.default_rng(0)
+    index = DenseIndex.build(rng.normal(size=(50, 8)), [f'text {i}' for i in range(50)], nlist=4, dtype=dtype)
+    query = rng.normal(size=8).astype(np.float32)
+    rows = np.arange(3, 40, dtype=np.int64)
+    for candidates in (None, rows):
+        expected = index._top_k(query, candidates, 5, block_size=1000)
+        blocked = index._top_k(query, candidates, 5, block_size=7)
+        assert [i for i, _ in blocked] == [i for i, _ in expected]
+        np.testing.assert_allclose([s for _, s in blocked], [s for _, s in expected], rtol=1e-5)
+        assert len(expected) == 5
+        assert [score for _, score in expected] == sorted((score for _, score in expected), reverse=True)
+
+
+def test_saved_index_appends_and_reloads(tmp_path):
+    rng = np.random.default_rng(1)
+    dense = DenseIndex.build(rng.normal(size=(4, 8)), ['a', 'b', 'c', 'd'], nlist=2)
+    dense.save(str(tmp_path / 'dense'))
+    dense.append(rng.normal(size=(2, 8)), ['e', 'f'])
+    loaded = DenseIndex.load(str(tmp_path / 'dense'))
+    assert list(loaded.texts) == ['a', 'b', 'c', 'd', 'e', 'f']
+    assert loaded.version == 1
+
@@ -0,0 +1,46 @@
+import pytest
+from kaag.utils.expression import compile_expression
+
+
+def test_affine_expressions_have_a_linear_form():
+    expression = compile_expression("lambda s: s['trust'] * 0.5 - 2 ** -1")
+    assert expression.linear == ({'trust': 0.5}, -0.5)
+    assert expression({'trust': 3}) == 1.0
+
+
+def test_small_literal_exponents_are_allowed():
+    expression = compile_expression("state['trust'] ** 2")
+    assert expression.linear is None
+    assert expression({'trust': 3}) == 9
+
+
+@pytest.mark.parametrize('source', [
+    "9 ** 9 ** 9 ** 9", "2 ** 100", "state['trust'] ** state['trust']", "state['trust'] ** (1 + 1)",
+])
+def test_unbounded_exponents_are_rejected(source):
+    with pytest.raises(ValueError, match='Exponents'):
+        compile_expression(source)
+
+
+@pytest.mark.parametrize('source', ["state['trust'] + 'x'", "state[0]", "__import__('os')", "True + 1"])
+def test_unsupported_syntax_is_rejected(source):
+    with pytest.raises(ValueError):
+        compile_expression(source)
+
+
+@pytest.mark.parametrize('source', ["((((9 ** 16) ** 16) ** 16) ** 16) ** 16", "(state['trust'] ** 2) ** 2"])
+def test_nested_powers_are_rejected(source):
+    with pytest.raises(ValueError, match='Nested powers'):
+        compile_expression(source)
+
+
+@pytest.mark.parametrize('source', ["1 / 0", "(-8) ** 0.5", "1e308 * 10", "1e308 + 1e308 + state['trust']"])
+def test_invalid_constants_are_rejected(source):
+    with pytest.raises(ValueError):
+        compile_expression(source)
+
+
+def test_overflowing_powers_evaluate_to_infinity():
+    assert compile_expression("state['x'] ** 16")({'x': 1e30}) == float('inf')
+    assert compile_expression("state['x'] ** 15")({'x': -1e30}) == float('-inf')
+    assert compile_expression("state['x'] ** -16")({'x': 1e30}) == 0.0
@@ -0,0 +1,38 @@
+from kaag.core.history import ConversationHistory
+
+
+def turn(i):
+    return {'user': f'question {i}', 'assistant': f'answer {i}'}
+
+
+def test_turn_window_drops_oldest_first():
+    evicted = []
+    history = ConversationHistory(max_turns=3, on_evict=evicted.append)
+    history.extend([turn(i) for i in range(5)])
+    assert list(history) == [turn(2), turn(3), turn(4)]
+    assert evicted == [turn(0), turn(1)]
+    assert history.total_turns == 5
+    assert history.format() == ''.join(ConversationHistory.format_turn(turn(i)) for i in (2, 3, 4))
+    assert history[-1] == turn(4) and history[:2] == [turn(2), turn(3)]
+
+
+def test_token_limit_drops_oldest_first_but_keeps_the_newest_turn():
+    evicted = []
+    history = ConversationHistory(max_turns=None, max_tokens=75, token_counter=len, on_evict=evicted.append)
+    for i in range(4):
+        history.append(turn(i))
+    # Each formatted turn is 37 characters, so two fit in 75.
+    assert list(history) == [turn(2), turn(3)]
+    assert evicted == [turn(0), turn(1)]
+    assert history.tokens == len(history.format()) == 74
+
+    history.append({'user': 'x' * 100, 'assistant': 'y'})
+    assert len(history) == 1 and history.tokens > 75
+
+
+def test_formatted_turns_match_the_window():
+    history = ConversationHistory(max_turns=2)
+    history.extend([turn(i) for i in range(3)])
+    assert history.formatted_turns() == [ConversationHistory.format_turn(turn(i)) for i in (1, 2)]
+    history.clear()
+    assert history.format() == '' and len(history) == 0
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+import types
+
+
+def loaded_modules(statement):
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    return set(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split())
+
+
+def test_agents_do_not_import_heavy_dependencies():
+    modules = loaded_modules("from kaag.core import NoRAG, RAG")
+    assert not modules & {'numpy', 'scipy', 'sklearn', 'networkx'}
+
+
+def test_dense_retriever_does_not_import_scikit_learn():
+    modules = loaded_modules("from kaag.knowledge_retriever import DenseKnowledgeRetriever")
+    assert not modules & {'scipy', 'sklearn'}
+
+
+def test_lazy_exports_resolve_and_submodules_stay_modules():
+    import kaag.knowledge_retriever as knowledge_retriever
+    import kaag.knowledge_retriever.ingest as ingest
+
+    assert isinstance(ingest, types.ModuleType)
+    assert knowledge_retriever.ingest_paths is ingest.ingest_paths
+    assert 'TextStore' in dir(knowledge_retriever)
+    try:
+        knowledge_retriever.missing
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("expected AttributeError")
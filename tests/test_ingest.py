@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from kaag.knowledge_retriever.dense import DenseIndex
+from kaag.knowledge_retriever.ingest import Chunker, build_dense_index, build_tfidf_index
+
+
+def test_char_chunks_stop_at_the_end_of_the_text():
+    text = 'abcdefghijklmnopqrst'
+    assert list(Chunker(20, 5, 'char').chunk_blocks([text])) == [text]
+    assert list(Chunker(10, 5, 'char').chunk_blocks([text[:7], text[7:]])) == [
+        'abcdefghij', 'fghijklmno', 'klmnopqrst'
+    ]
+    assert list(Chunker(10, 5, 'char').chunk_blocks([text + 'u']))[-1] == 'pqrstu'
+
+
+def test_token_chunks_stop_at_the_end_of_the_text():
+    words = ' '.join(f'w{i}' for i in range(8))
+    assert list(Chunker(4, 2, 'token').chunk_blocks([words])) == ['w0 w1 w2 w3', 'w2 w3 w4 w5', 'w4 w5 w6 w7']
+    assert list(Chunker(4, 2, 'token').chunk_blocks([words + ' w8']))[-1] == 'w6 w7 w8'
+    assert list(Chunker(4, 0, 'token').chunk_blocks([words[:5], words[5:]])) == ['w0 w1 w2 w3', 'w4 w5 w6 w7']
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    lines = ['red apples and green pears', 'green pears', 'blue berries and red apples', 'plain water']
+    path = tmp_path / 'corpus.txt'
+    path.write_text('\n'.join(lines))
+    return str(path)
+
+
+@pytest.mark.parametrize('params', [
+    {}, {'smooth_idf': False}, {'sublinear_tf': True, 'norm': 'l1'},
+])
+def test_tfidf_index_matches_scikit_learn(corpus, params):
+    path = corpus
+    index = build_tfidf_index(path, chunker=Chunker(30, 0, 'char'), **params)
+    expected = TfidfVectorizer(**params).fit(index.texts[i] for i in range(len(index)))
+    np.testing.assert_allclose(index.vectorizer.idf_, expected.idf_, rtol=1e-6)
+    np.testing.assert_allclose(
+        index.matrix.toarray(),
+        expected.transform(index.texts[i] for i in range(len(index))).toarray(),
+        rtol=1e-5, atol=1e-6
+    )
+
+
+def test_tfidf_index_rejects_use_idf_false(corpus):
+    with pytest.raises(ValueError, match='use_idf'):
+        build_tfidf_index(corpus, use_idf=False)
+
+
+@pytest.mark.parametrize('on_disk', [False, True])
+def test_dense_index_builds_lists_once(corpus, monkeypatch, tmp_path, on_disk):
+    path = corpus
+    rng = np.random.default_rng(0)
+    embedder = lambda texts: rng.normal(size=(len(texts), 8)).astype(np.float32)
+    builds = []
+    original = DenseIndex._build_lists
+    monkeypatch.setattr(DenseIndex, '_build_lists', lambda self: builds.append(1) or original(self))
+
+    index_path = str(tmp_path / 'index') if on_disk else None
+    index = build_dense_index(path, embedder, index_path, chunker=Chunker(12, 0, 'char'), batch_size=1,
+                              train_size=1, nlist=1)
+    assert len(index) > 3
+    # One build for the trained index and one for all appended batches.
+    assert len(builds) == 2
+    assert index.version == 1
+    chunks = list(Chunker(12, 0, 'char').chunk_paths(path))
+    assert [index.texts[i] for i in range(len(index))] == chunks
+    if on_disk:
+        loaded = DenseIndex.load(index_path)
+        assert [loaded.texts[i] for i in range(len(loaded))] == chunks
+        np.testing.assert_array_equal(loaded.assignments, index.assignments)
+
+
+def test_max_features_keeps_the_most_frequent_terms(corpus):
+    chunker = Chunker(30, 0, 'char')
+    index = build_tfidf_index(corpus, chunker=chunker, max_features=3)
+    counts = TfidfVectorizer(binary=True, use_idf=False, norm=None).fit(chunker.chunk_paths(corpus))
+    frequency = dict(zip(counts.get_feature_names_out(), counts.transform(chunker.chunk_paths(corpus)).sum(axis=0).A1))
+    expected = sorted(sorted(frequency, key=lambda term: -frequency[term])[:3])
+    assert list(index.vectorizer.vocabulary_) == expected
@@ -0,0 +1,87 @@
+import copy
+import json
+import logging
+import pytest
+from jinja2 import Template
+from kaag.core.graph import ConversationGraph
+from kaag.core.kaag import KAAG
+from kaag.llm.base import LLMInterface
+
+
+class EchoLLM(LLMInterface):
+    def generate(self, prompt: str, **kwargs) -> str:
+        return 'ok'
+
+    def get_model_info(self):
+        return {}
+
+
+CONFIG = {
+    'persona': 'a tester',
+    'initial_node': 'start',
+    'metrics': {'trust': {'initial': 50}},
+    'stages': [
+        {'id': 'start', 'transitions': [{'to': 'end', 'conditions': {'trust': [0, 100]}}]},
+        {'id': 'end', 'is_leaf': True},
+    ],
+    'history': {'max_turns': 2},
+}
+
+
+def test_history_settings_come_from_the_graph_config():
+    graph = ConversationGraph(CONFIG)
+    kaag = KAAG(EchoLLM(), copy.deepcopy(CONFIG), Template('{{ user_input }}'), graph=graph)
+    assert kaag.conversation_history.max_turns == 2
+
+
+def test_mismatched_config_and_graph_are_rejected():
+    graph = ConversationGraph(CONFIG)
+    config = dict(CONFIG, history={'max_turns': 9})
+    with pytest.raises(ValueError, match='config'):
+        KAAG(EchoLLM(), config, Template('{{ user_input }}'), graph=graph)
+
+
+def test_state_is_only_built_when_logged(monkeypatch):
+    kaag = KAAG(EchoLLM(), CONFIG, Template('{{ user_input }}'))
+    calls = []
+    monkeypatch.setattr(kaag, 'get_current_state', lambda: calls.append(1) or {})
+    kaag.logger.setLevel(logging.WARNING)
+    try:
+        kaag.process_turn('hello')
+    finally:
+        kaag.logger.setLevel(logging.INFO)
+    assert calls == []
+
+    kaag.process_turn('hello again')
+    assert calls == [1]
+
+
+def test_snapshot_survives_json_and_restores_on_a_new_session():
+    # The transition to the leaf needs trust >= 90, so the session stays at 'start' and keeps its history.
+    config = dict(CONFIG, stages=[
+        {'id': 'start', 'transitions': [{'to': 'end', 'conditions': {'trust': [90, 100]}}]},
+        {'id': 'end', 'is_leaf': True},
+    ])
+    graph = ConversationGraph(config)
+    session = KAAG(EchoLLM(), config, Template('{{ user_input }}'), graph=graph)
+    session.interaction_state['trust'] = 75
+    session.interaction_state['mood'] = 'curious'
+    for message in ('hi', 'tell me more', 'sounds good'):
+        session.process_turn(message)
+
+    snapshot = json.loads(json.dumps(session.snapshot()))
+    restored = KAAG(EchoLLM(), config, Template('{{ user_input }}'), graph=graph)
+    restored.restore(snapshot)
+    assert restored.current_node == session.current_node
+    assert restored.interaction_state.to_dict() == session.interaction_state.to_dict()
+    assert list(restored.conversation_history) == list(session.conversation_history)
+    assert [turn['user'] for turn in restored.conversation_history] == ['tell me more', 'sounds good']
+    assert restored.conversation_history.total_turns == session.conversation_history.total_turns == 3
+
+
+def test_snapshot_from_another_graph_is_rejected():
+    session = KAAG(EchoLLM(), CONFIG, Template('{{ user_input }}'))
+    other = dict(CONFIG, metrics={'trust': {'initial': 50}, 'interest': {'initial': 10}})
+    restored = KAAG(EchoLLM(), other, Template('{{ user_input }}'))
+    with pytest.raises(ValueError, match='different conversation graph'):
+        restored.restore(session.snapshot())
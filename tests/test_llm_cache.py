@@ -0,0 +1,103 @@
+from typing import Any, Dict, Iterator, List
+import pytest
+from kaag.llm import cache as cache_module
+from kaag.llm.base import LLMInterface
+from kaag.llm.cache import CachingLLM
+
+
+class CountingLLM(LLMInterface):
+    model = 'counting'
+
+    def __init__(self):
+        self.prompts: List[str] = []
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        self.prompts.append(prompt)
+        return f'response {len(self.prompts)}'
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        response = self.generate(prompt, **kwargs)
+        yield response[:5]
+        yield response[5:]
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return {}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, 'time', clock.time)
+    return clock
+
+
+def test_memory_hits_ignore_trailing_whitespace():
+    backend = CountingLLM()
+    llm = CachingLLM(backend)
+    assert llm.generate('hello') == 'response 1'
+    assert llm.generate('hello  \r\n') == 'response 1'
+    assert llm.generate('hello', options={'temperature': 0}) == 'response 2'
+    assert backend.prompts == ['hello', 'hello']
+    assert llm.stats()['memory_hits'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    backend = CountingLLM()
+    llm = CachingLLM(backend, maxsize=2)
+    llm.generate('a')
+    llm.generate('b')
+    llm.generate('a')
+    llm.generate('c')
+    assert llm.generate('a') == 'response 1'
+    assert llm.generate('b') == 'response 4'
+    assert backend.prompts == ['a', 'b', 'c', 'b']
+
+
+def test_expired_entries_are_regenerated(clock):
+    backend = CountingLLM()
+    llm = CachingLLM(backend, ttl=10)
+    llm.generate('hello')
+    clock.now += 10
+    assert llm.generate('hello') == 'response 1'
+    clock.now += 1
+    assert llm.generate('hello') == 'response 2'
+
+
+def test_disk_tier_is_shared_with_new_instances(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    first = CachingLLM(CountingLLM(), disk_path=path, ttl=60)
+    assert list(first.generate_stream('hello')) == ['respo', 'nse 1']
+    first.close()
+
+    backend = CountingLLM()
+    second = CachingLLM(backend, disk_path=path, ttl=60)
+    assert second.generate('hello') == 'response 1'
+    assert list(second.generate_stream('hello')) == ['response 1']
+    assert backend.prompts == []
+    assert second.stats()['disk_hits'] == 1 and second.stats()['memory_hits'] == 1
+
+    clock.now += 61
+    third = CachingLLM(backend, disk_path=path, ttl=60)
+    assert third.generate('hello') == 'response 1'
+    assert backend.prompts == ['hello']
+    second.close()
+    third.close()
+
+
+def test_deterministic_only_bypasses_sampled_calls():
+    backend = CountingLLM()
+    llm = CachingLLM(backend, deterministic_only=True)
+    assert llm.generate('hello') == 'response 1'
+    assert llm.generate('hello', options={'temperature': 0.7}) == 'response 2'
+    assert llm.generate('hello', options={'temperature': 0}) == 'response 3'
+    assert llm.generate('hello', options={'temperature': 0}) == 'response 3'
+    assert llm.generate('hello', temperature=0) == 'response 4'
+    assert llm.stats()['bypassed'] == 2
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from kaag.llm.ollama import OllamaLLM
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.client_address, body))
+        prompt = body['prompt']
+
+        if prompt == 'fail':
+            self.send_json(500, {'error': 'model crashed'})
+        elif prompt == 'flaky' and self.server.flaky_failures > 0:
+            self.server.flaky_failures -= 1
+            self.send_json(503, {'error': 'busy'})
+        elif not body.get('stream'):
+            self.send_json(200, {'response': f'echo: {prompt}', 'done': True})
+        else:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self.send_chunk({'response': 'first ', 'done': False})
+            # The rest is held back until the client has seen the first chunk.
+            self.server.release.wait(5)
+            if prompt == 'stream error':
+                self.send_chunk({'error': 'out of memory'})
+            else:
+                self.send_chunk({'response': 'second', 'done': False})
+                self.send_chunk({'response': '', 'done': True})
+            self.wfile.write(b'0\r\n\r\n')
+
+    def do_GET(self):
+        self.server.requests.append((self.client_address, None))
+        self.send_json(200, {'modelfile': 'FROM stub'})
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_chunk(self, payload):
+        data = json.dumps(payload).encode() + b'\n'
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    server.daemon_threads = True
+    server.requests = []
+    server.flaky_failures = 0
+    server.release = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def llm(server):
+    llm = OllamaLLM(model='stub', api_url=f'http://127.0.0.1:{server.server_address[1]}', backoff_factor=0)
+    yield llm
+    llm.close()
+
+
+def test_requests_reuse_one_pooled_connection(server, llm):
+    assert [llm.generate(f'hello {i}') for i in range(3)] == ['echo: hello 0', 'echo: hello 1', 'echo: hello 2']
+    assert llm.get_model_info() == {'modelfile': 'FROM stub'}
+    clients = {client for client, _ in server.requests}
+    assert len(server.requests) == 4
+    assert len(clients) == 1
+
+
+def test_generation_options_are_forwarded(server, llm):
+    llm.generate('hi', options={'temperature': 0})
+    assert server.requests[0][1] == {'model': 'stub', 'prompt': 'hi', 'stream': False, 'options': {'temperature': 0}}
+
+
+def test_stream_yields_chunks_as_they_arrive(server, llm):
+    stream = llm.generate_stream('tell me')
+    assert next(stream) == 'first '
+    server.release.set()
+    assert list(stream) == ['second']
+    assert server.requests[0][1]['stream'] is True
+
+
+def test_http_errors_raise(server, llm):
+    with pytest.raises(requests.HTTPError):
+        llm.generate('fail')
+
+
+def test_unavailable_responses_are_retried(server, llm):
+    server.flaky_failures = 2
+    assert llm.generate('flaky') == 'echo: flaky'
+    assert len(server.requests) == 3
+
+
+def test_stream_errors_raise(server, llm):
+    stream = llm.generate_stream('stream error')
+    assert next(stream) == 'first '
+    server.release.set()
+    with pytest.raises(RuntimeError, match='out of memory'):
+        next(stream)
+
+
+def test_async_model_info_waits_for_a_free_slot(server):
+    from kaag.llm.ollama_async import AsyncOllamaLLM
+
+    async def run():
+        async with AsyncOllamaLLM(model='stub', api_url=f'http://127.0.0.1:{server.server_address[1]}',
+                                  max_concurrency=1) as llm:
+            llm._get_session()
+            async with llm._semaphore:
+                info = asyncio.ensure_future(llm.aget_model_info())
+                await asyncio.sleep(0.05)
+                assert not info.done() and server.requests == []
+            return await info
+
+    assert asyncio.run(run()) == {'modelfile': 'FROM stub'}
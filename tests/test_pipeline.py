@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from kaag.analyzers.base import BaseAnalyzer
+from kaag.analyzers.pipeline import AnalyzerPipeline
+
+
+class Analyzer(BaseAnalyzer):
+    """Returns ``compute(state)`` after ``delay`` seconds and records the thread it ran on."""
+
+    def __init__(self, reads: Optional[Tuple[str, ...]], writes: Optional[Tuple[str, ...]], compute=None,
+                 delay: float = 0.0, timeout: Optional[float] = None):
+        self.reads = reads
+        self.writes = writes
+        self.compute = compute or (lambda state: {key: 1 for key in writes})
+        self.delay = delay
+        self.timeout = timeout
+        self.threads = []
+
+    def analyze(self, current_state: Dict[str, Any]) -> Dict[str, Any]:
+        self.threads.append(threading.current_thread())
+        time.sleep(self.delay)
+        return self.compute(current_state)
+
+    def update_properties(self, properties: Any) -> None:
+        pass
+
+
+def build():
+    return [
+        Analyzer(('message',), ('sentiment',), lambda state: {'sentiment': len(state['message'])}),
+        Analyzer(('message',), ('topic',), lambda state: {'topic': state['message'].upper()}),
+        Analyzer(('sentiment', 'topic'), ('trust',), lambda state: {'trust': state['sentiment'] * 10}),
+        Analyzer(None, None, lambda state: {'summary': f"{state['topic']}:{state['trust']}"}),
+    ]
+
+
+def test_levels_follow_declared_dependencies():
+    pipeline = AnalyzerPipeline(build(), ['sentiment', 'topic', 'trust', 'summary'])
+    assert pipeline.stats()['levels'] == [['sentiment', 'topic'], ['trust'], ['summary']]
+
+
+def test_run_and_arun_produce_the_same_state():
+    state = {'message': 'hello'}
+    AnalyzerPipeline(build()).run(state)
+    async_state = {'message': 'hello'}
+    asyncio.run(AnalyzerPipeline(build()).arun(async_state))
+    assert state == async_state == {
+        'message': 'hello', 'sentiment': 5, 'topic': 'HELLO', 'trust': 50, 'summary': 'HELLO:50'
+    }
+
+
+def test_timed_out_analyzers_keep_previous_values():
+    analyzers = [
+        Analyzer(('message',), ('fast',), delay=0.0, timeout=0.5),
+        Analyzer(('message',), ('slow',), lambda state: {'slow': 'new'}, delay=0.3, timeout=0.05),
+    ]
+    for run in (AnalyzerPipeline.run, lambda pipeline, state: asyncio.run(pipeline.arun(state))):
+        pipeline = AnalyzerPipeline(analyzers, ['fast', 'slow'])
+        state = {'message': 'hi', 'slow': 'previous'}
+        run(pipeline, state)
+        assert state == {'message': 'hi', 'fast': 1, 'slow': 'previous'}
+        assert pipeline.stats()['timeouts'] == {'fast': 0, 'slow': 1}
+        time.sleep(0.3)
+
+
+def test_blocking_analyzers_run_off_the_event_loop():
+    analyzer = Analyzer(None, None, lambda state: {'done': True})
+    state = {}
+    asyncio.run(AnalyzerPipeline([analyzer]).arun(state))
+    assert state == {'done': True}
+    assert threading.main_thread() not in analyzer.threads
@@ -0,0 +1,74 @@
+import random
+import warnings
+
+import numpy as np
+import pytest
+
+from kaag.dbn.dbn import DynamicBayesianNetwork
+from kaag.gim.gim import GamifiedInteractionModel
+from kaag.gim.policies import POLICIES, SoftmaxPolicy, create_policy
+from kaag.utils.expression import compile_expression
+
+POLICY_CONFIGS = [
+    {'type': 'greedy'},
+    {'type': 'softmax', 'temperature': 0.5, 'exploration_rate': 0.1},
+    {'type': 'epsilon_greedy', 'epsilon': 0.1},
+    {'type': 'ucb', 'c': 1.0},
+]
+
+
+def build_network(magnitude):
+    dbn = DynamicBayesianNetwork()
+    for node in ('start', 'a', 'b', 'c'):
+        dbn.add_node(node, is_leaf=node != 'start')
+    for child, utility in (('a', magnitude), ('b', magnitude * 0.5), ('c', -magnitude)):
+        dbn.add_edge('start', child, lambda state: True, compile_expression(repr(utility)), bounds={})
+    dbn.compile(['trust'])
+    return dbn
+
+
+@pytest.mark.parametrize('policy_config', POLICY_CONFIGS, ids=lambda config: config['type'])
+@pytest.mark.parametrize('magnitude', [1e2, 1e3, 1e6, 1e100])
+def test_large_utilities_do_not_overflow(policy_config, magnitude):
+    # exp(u / temperature) overflows for these utilities unless the maximum is subtracted
+    # first. Weights underflowing to zero are expected and allowed.
+    dbn = build_network(magnitude)
+    gim = GamifiedInteractionModel(dbn, create_policy(policy_config), seed=0)
+
+    with warnings.catch_warnings(), np.errstate(over='raise', invalid='raise', divide='raise'):
+        warnings.simplefilter('error')
+        choices = [gim.select_next_node('start', {'trust': 50}) for _ in range(200)]
+        batch = gim.select_next_nodes(np.zeros(200, dtype=np.int64), np.full((200, 1), 50.0),
+                                      rng=np.random.default_rng(0))
+
+    # Only exploration may pick the clearly worse transitions.
+    assert choices.count('a') > 150
+    assert (batch == dbn.compiled.node_index['a']).sum() > 150
+
+
+def test_batch_selection_does_not_depend_on_chunk_size():
+    dbn = build_network(1.0)
+    gim = GamifiedInteractionModel(dbn, create_policy(None), seed=0)
+    nodes = np.zeros(1000, dtype=np.int64)
+    vectors = np.full((1000, 1), 50.0)
+    whole = gim.select_next_nodes(nodes, vectors, rng=np.random.default_rng(3))
+    chunked = gim.select_next_nodes(nodes, vectors, rng=np.random.default_rng(3), chunk_size=7)
+    assert (whole == chunked).all()
+
+
+def test_softmax_defaults_match_the_default_policy():
+    default = create_policy(None)
+    configured = create_policy({'type': 'softmax'})
+    assert isinstance(default, SoftmaxPolicy) and isinstance(configured, SoftmaxPolicy)
+    assert (default.temperature, default.exploration_rate) == (configured.temperature, configured.exploration_rate) == (0.5, 0.1)
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError, match='Unknown selection policy'):
+        create_policy({'type': 'random'})
+    assert set(POLICIES) == {'greedy', 'softmax', 'epsilon_greedy', 'ucb'}
+
+
+def test_greedy_picks_the_highest_utility():
+    policy = create_policy({'type': 'greedy'})
+    assert policy.select('start', ['a', 'b', 'c'], [1.0, 3.0, 2.0], random.Random(0)) == 1
@@ -0,0 +1,46 @@
+from jinja2 import Template
+from kaag.core.prompt import PromptCache
+
+SPLIT = Template(
+    "{% block static %}You are {{ persona }}.\n{% for e in examples %}- {{ e }}\n{% endfor %}{% endblock %}"
+    "{% block dynamic %}History: {{ history }}\nUser: {{ message }}{% endblock %}"
+)
+UNSPLIT = Template("You are {{ persona }}. User: {{ message }}")
+# Text outside the blocks means the blocks do not cover the whole output.
+PARTIAL = Template("{% block static %}You are {{ persona }}.{% endblock %} -- {% block dynamic %}{{ message }}{% endblock %}")
+
+
+def contexts(turn):
+    return {'persona': 'a guide', 'examples': ['one', 'two']}, {'history': 'h' * turn, 'message': f'turn {turn}'}
+
+
+def test_cached_prompts_match_full_renders():
+    cache = PromptCache()
+    owner = object()
+    for template in (SPLIT, UNSPLIT, PARTIAL):
+        for turn in range(3):
+            static, dynamic = contexts(turn)
+            prompt = cache.render(template, owner, 'stage', static, dynamic)
+            assert prompt.encode() == template.render(**static, **dynamic).encode()
+
+
+def test_static_prefix_is_rendered_once_per_stage():
+    cache = PromptCache()
+    owner = object()
+    for turn in range(3):
+        cache.render(SPLIT, owner, 'stage', *contexts(turn))
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+    assert cache.get_static_prefix(SPLIT, owner, 'stage') == 'You are a guide.\n- one\n- two\n'
+    assert cache.get_static_prefix(SPLIT, owner, 'other stage') is None
+
+    cache.render(PARTIAL, owner, 'stage', *contexts(0))
+    assert cache.get_static_prefix(PARTIAL, owner, 'stage') is None
+
+
+def test_least_recently_used_prefix_is_evicted():
+    cache = PromptCache(maxsize=2)
+    owner = object()
+    for key in ('a', 'b', 'a', 'c'):
+        cache.render(SPLIT, owner, key, *contexts(0))
+    assert cache.get_static_prefix(SPLIT, owner, 'a') is not None
+    assert cache.get_static_prefix(SPLIT, owner, 'b') is None
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+from typing import List
+from jinja2 import Template
+from kaag.core.rag import RAG
+from kaag.knowledge_retriever.base import BaseKnowledgeRetriever
+from kaag.llm.base import LLMInterface
+
+
+class EchoLLM(LLMInterface):
+    def generate(self, prompt: str, **kwargs) -> str:
+        return prompt
+
+    def get_model_info(self):
+        return {}
+
+
+class ThreadRecordingRetriever(BaseKnowledgeRetriever):
+    def __init__(self):
+        self.threads: List[threading.Thread] = []
+
+    def retrieve(self, query: str) -> str:
+        return ' '.join(self.retrieve_passages(query))
+
+    def retrieve_passages(self, query: str) -> List[str]:
+        self.threads.append(threading.current_thread())
+        return [f'facts about {query}']
+
+
+def test_async_turns_retrieve_off_the_event_loop():
+    retriever = ThreadRecordingRetriever()
+    rag = RAG(EchoLLM(), {'persona': 'a tester'}, retriever,
+              Template('{{ retrieved_information }} | {{ user_message }}'))
+
+    async def run():
+        response = await rag.aprocess_turn('cats')
+        chunks = [chunk async for chunk in rag.aprocess_turn_stream('dogs')]
+        return response, chunks
+
+    response, chunks = asyncio.run(run())
+    assert response == 'facts about cats | cats'
+    assert ''.join(chunks) == 'facts about dogs | dogs'
+    assert rag.process_turn('birds') == 'facts about birds | birds'
+    assert threading.main_thread() not in retriever.threads[:2]
+    assert retriever.threads[2] is threading.main_thread()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from kaag.core.state import MetricSchema, StateBank
+
+SCHEMA = MetricSchema(['trust', 'interest'], {'trust': 50})
+
+
+def test_bank_rows_share_storage_with_their_states():
+    bank = StateBank(SCHEMA, capacity=2)
+    first, second = bank.allocate(), bank.allocate()
+    first['trust'] = 70
+    bank.vectors[second.row, 1] = 5
+    assert bank.vectors[first.row].tolist() == [70.0, 0.0]
+    assert second['interest'] == 5.0
+
+    # Growing the bank moves the rows; live states follow them.
+    third = bank.allocate()
+    assert len(bank.vectors) == 4 and len(bank) == 3
+    first['interest'] = 9
+    assert bank.vectors[first.row].tolist() == [70.0, 9.0]
+    assert np.shares_memory(third.vector, bank.vectors)
+    np.testing.assert_array_equal(bank.rows, [0, 1, 2])
+
+
+def test_released_states_keep_their_values_and_free_the_row():
+    bank = StateBank(SCHEMA, capacity=1)
+    state = bank.allocate()
+    state['trust'] = 80
+    row = state.row
+    bank.release(state)
+    assert state['trust'] == 80.0 and state.row is None
+    assert bank.allocate().row == row
+    assert state['trust'] == 80.0
+    with pytest.raises(ValueError):
+        bank.release(state)
+
+
+def test_to_dict_round_trips():
+    state = SCHEMA.new_state()
+    state.update({'trust': 65, 'last_message': 'hi'}, mood='curious')
+    snapshot = state.to_dict()
+    assert snapshot == {'trust': 65.0, 'interest': 0.0, 'last_message': 'hi', 'mood': 'curious'}
+
+    restored = SCHEMA.new_state()
+    restored.update(snapshot)
+    assert restored.to_dict() == snapshot
+    assert dict(restored) == snapshot
+    with pytest.raises(KeyError):
+        del restored['trust']
@@ -0,0 +1,25 @@
+import pytest
+from kaag.knowledge_retriever.text_file import TextFileKnowledgeRetriever
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    path = tmp_path / 'knowledge.txt'
+    path.write_text("Our plan costs ten dollars. Support is open all week. "
+                    "The premium plan adds priority support! Refunds take five days.")
+    return TextFileKnowledgeRetriever(str(path), top_k=2)
+
+
+def test_retrieve_returns_the_best_matching_sentences(retriever):
+    assert retriever.retrieve('premium plan') == 'The premium plan adds priority support! Our plan costs ten dollars.'
+
+
+def test_queries_without_matching_terms_retrieve_nothing(retriever):
+    assert retriever.retrieve('weather tomorrow') == ''
+    assert retriever.retrieve_passages('weather tomorrow') == []
+
+
+def test_batch_retrieval_matches_single_queries(retriever):
+    queries = ['premium plan', 'weather tomorrow', 'support refunds', 'plan']
+    assert retriever.retrieve_batch(queries) == [retriever.retrieve(query) for query in queries]
+    assert retriever.retrieve_passages_batch(queries) == [retriever.retrieve_passages(query) for query in queries]
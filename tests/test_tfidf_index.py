@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from kaag.knowledge_retriever.tfidf_index import TfidfIndex
+
+TEXTS = ['red apples and green pears', 'green pears are sweet', 'blue berries and red apples', 'plain water']
+QUERIES = ['red apples', 'sweet green pears', 'water', 'unknown words']
+
+
+def test_loaded_index_gives_the_same_scores(tmp_path):
+    index = TfidfIndex.build(TEXTS, ngram_range=(1, 2), sublinear_tf=True)
+    expected = index.search_batch(QUERIES, 3)
+    index.save(str(tmp_path / 'index'))
+
+    loaded = TfidfIndex.load(str(tmp_path / 'index'))
+    assert list(loaded.texts) == TEXTS
+    assert loaded.vectorizer_params == {'ngram_range': (1, 2), 'sublinear_tf': True}
+    np.testing.assert_array_equal(loaded.matrix.toarray(), index.matrix.toarray())
+    assert loaded.search_batch(QUERIES, 3) == expected
+
+
+@pytest.mark.parametrize('on_disk', [False, True])
+def test_appended_documents_are_searchable_with_the_frozen_vocabulary(tmp_path, on_disk):
+    index = TfidfIndex.build(TEXTS)
+    vocabulary = dict(index.vectorizer.vocabulary_)
+    if on_disk:
+        index.save(str(tmp_path / 'index'))
+    index.append(['sweet red apples with mango'])
+
+    assert index.vectorizer.vocabulary_ == vocabulary
+    assert index.version == 1
+    assert index.search_batch(['sweet red apples'], 1)[0][0][0] == 4
+    # Terms first seen in appended documents are not in the vocabulary and match nothing.
+    assert index.search_batch(['mango'], 3) == [[]]
+
+    if on_disk:
+        loaded = TfidfIndex.load(str(tmp_path / 'index'))
+        assert loaded.version == 1
+        assert loaded.search_batch(['sweet red apples'], 1) == index.search_batch(['sweet red apples'], 1)